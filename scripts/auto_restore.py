@@ -4,6 +4,8 @@ Auto-Restore Script
 Stellt Metadaten-Änderungen automatisch wieder her wenn Steam sie überschreibt
 """
 
+import argparse
+import signal
 import sys
 from pathlib import Path
 
@@ -11,11 +13,35 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.core.appinfo_manager import AppInfoManager
+from src.core.appinfo_watcher import AppInfoWatcher
 from src.config import config
 
 
+def watch(manager: AppInfoManager, interval: float) -> int:
+    """Keep running and reapply modifications whenever Steam rewrites appinfo.vdf"""
+    # Catch up with whatever Steam changed while nobody was watching
+    manager.restore_overwritten()
+    # The GUI may have edited modifications since the last pass
+    watcher = AppInfoWatcher(manager.appinfo_path, lambda: manager.restore_overwritten(reload=True),
+                             interval=interval)
+    signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    print("\n👋 Stopped watching")
+    return 0
+
+
 def main():
     """Main auto-restore function"""
+    parser = argparse.ArgumentParser(description="Reapply metadata changes Steam has overwritten")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and restore after every change of appinfo.vdf")
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help="seconds between checks when inotify is not available")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("🔄  Steam Library Manager - Auto-Restore")
     print("=" * 60)
@@ -35,22 +61,24 @@ def main():
         return 0
     
     print(f"\n📝 Found {mod_count} tracked modifications")
+
+    if args.watch:
+        return watch(manager, args.interval)
+
     print("🔄 Restoring changes...")
     
-    # Load appinfo
-    data = manager.load_appinfo()
-    
-    if not data:
+    # Index appinfo (only the tracked apps get decoded)
+    if not manager.load_index():
         print("❌ Failed to load appinfo.vdf")
         return 1
     
     # Restore modifications
-    restored = manager.restore_modifications(data)
+    restored = manager.restore_modifications()
     
     if restored > 0:
         # Save back
         print("\n💾 Saving changes...")
-        if manager.save_appinfo(data, create_backup=True):
+        if manager.save_appinfo(create_backup=True):
             print(f"✅ Successfully restored {restored} modifications!")
             print(f"   Backup created in: {manager.backup_dir}")
             return 0
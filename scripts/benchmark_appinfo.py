@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+AppInfo Benchmark
+Misst die Geschwindigkeit von AppInfoParser
+
+  benchmark_appinfo.py [appinfo.vdf]   Reader-Vergleich auf einer echten Datei
+  benchmark_appinfo.py --suite         load/dump/encode/round-trip/Speicher
+                                       auf synthetischen Dateien (v27/v28/v29)
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.appinfo_vdf_parser import AppInfoParser
+from generate_appinfo import VERSIONS, write_appinfo
+
+
+def _time(func, repeat: int):
+    """Run func repeat times, return (best seconds, last result)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _peak_memory(func) -> int:
+    """Peak traced allocation in bytes while func runs (result is dropped)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def compare_readers(path: Path, repeat: int) -> int:
+    """Stream vs. mmap vs. projection vs. parallel on one file"""
+    size_mb = path.stat().st_size / (1024 * 1024)
+    print(f"📄 {path} ({size_mb:.1f} MB, best of {repeat})")
+
+    stream_time, stream_data = _time(lambda: AppInfoParser.load(path, use_mmap=False), repeat)
+    print(f"   stream: {stream_time:8.3f}s  {size_mb / stream_time:8.1f} MB/s")
+
+    mmap_time, mmap_data = _time(lambda: AppInfoParser.load(path), repeat)
+    print(f"   mmap:   {mmap_time:8.3f}s  {size_mb / mmap_time:8.1f} MB/s")
+
+    if stream_data != mmap_data:
+        print("❌ Readers disagree!")
+        return 1
+
+    paths = ['appinfo.common']
+    projection_time, _ = _time(lambda: AppInfoParser.load(path, paths=paths), repeat)
+    print(f"   common: {projection_time:8.3f}s  {size_mb / projection_time:8.1f} MB/s  (paths={paths})")
+
+    print(f"✅ {len(mmap_data)} apps, speedup {stream_time / mmap_time:.1f}x")
+
+    # Scaling of the parallel loader, 1 worker is the plain mmap reader
+    max_workers = os.cpu_count() or 1
+    print(f"\n⚙️  Parallel load (1-{max_workers} workers)")
+    for workers in range(1, max_workers + 1):
+        if workers == 1:
+            parallel_time = mmap_time
+        else:
+            parallel_time, parallel_data = _time(lambda: AppInfoParser.load(path, workers=workers), repeat)
+            if parallel_data != mmap_data:
+                print(f"❌ {workers} workers disagree with the mmap reader!")
+                return 1
+        print(f"   {workers:2d}: {parallel_time:8.3f}s  {mmap_time / parallel_time:5.2f}x")
+    return 0
+
+
+def _encode(data, version: int) -> int:
+    """Serialize all apps to binary VDF only (no hashes, no file), return bytes produced"""
+    key_table = {} if version >= AppInfoParser.MAGIC_V29 else None
+    write_object = AppInfoParser._make_serializer(key_table)
+    buf = bytearray()
+    for app in data.values():
+        write_object(buf, app)
+    return len(buf)
+
+
+def run_suite(sizes, versions, repeat: int, depth: int, string_size: int) -> int:
+    """load, dump, binary encoding, round-trip and peak memory on synthetic files"""
+    print(f"🧪 Synthetic suite (best of {repeat}, depth {depth}, strings ~{string_size} chars)")
+    print(f"   {'ver':>3} {'apps':>7} {'MB':>7} {'load s':>8} {'dump s':>8} {'trip s':>8} "
+          f"{'load MB/s':>9} {'dump MB/s':>9} {'enc MB/s':>9} {'peak MB':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for version in versions:
+            for count in sizes:
+                source = Path(tmp) / f'appinfo_v{version}_{count}.vdf'
+                target = Path(tmp) / 'dump.vdf'
+                if not write_appinfo(source, count, version, depth, string_size):
+                    print(f"❌ Failed to generate {source.name}")
+                    return 1
+                size_mb = source.stat().st_size / (1024 * 1024)
+
+                load_time, data = _time(lambda: AppInfoParser.load(source), repeat)
+                dump_time, _ = _time(lambda: AppInfoParser.dump(data, target, VERSIONS[version]), repeat)
+                encode_time, encoded = _time(lambda: _encode(data, VERSIONS[version]), repeat)
+
+                def round_trip():
+                    AppInfoParser.dump(AppInfoParser.load(source), target, VERSIONS[version])
+                    return AppInfoParser.load(target)
+
+                trip_time, trip_data = _time(round_trip, 1)
+                if trip_data != data:
+                    print(f"❌ Round-trip mismatch for v{version} with {count} apps")
+                    return 1
+
+                del data, trip_data
+                peak = _peak_memory(lambda: AppInfoParser.load(source))
+
+                print(f"   {version:>3} {count:>7} {size_mb:>7.1f} {load_time:>8.3f} {dump_time:>8.3f} "
+                      f"{trip_time:>8.3f} {size_mb / load_time:>9.1f} {size_mb / dump_time:>9.1f} "
+                      f"{encoded / (1024 * 1024) / encode_time:>9.1f} {peak / (1024 * 1024):>8.1f}")
+                source.unlink()
+
+    print("✅ Suite finished")
+    return 0
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark AppInfoParser")
+    parser.add_argument('path', nargs='?', type=Path, help="appinfo.vdf to compare readers on")
+    parser.add_argument('--suite', action='store_true', help="run the synthetic benchmark suite")
+    parser.add_argument('--sizes', default='1000,10000,150000', help="app counts for --suite")
+    parser.add_argument('--versions', default='27,28,29', help="format versions for --suite")
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--string-size', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.suite:
+        sizes = [int(size) for size in args.sizes.split(',')]
+        versions = [int(version) for version in args.versions.split(',')]
+        return run_suite(sizes, versions, args.repeat, args.depth, args.string_size)
+
+    path = args.path
+    if path is None:
+        from src.config import config
+        if not config.STEAM_PATH:
+            print("❌ Steam path not found, pass a path to appinfo.vdf")
+            return 1
+        path = config.STEAM_PATH / 'appcache' / 'appinfo.vdf'
+
+    if not path.exists():
+        print(f"❌ File not found: {path}")
+        return 1
+
+    return compare_readers(path, args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Synthetic AppInfo Generator
+Erzeugt appinfo.vdf Testdateien (v27/v28/v29) ohne Steam-Installation
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.appinfo_vdf_parser import AppInfoParser
+
+VERSIONS = {
+    27: AppInfoParser.MAGIC_V27,
+    28: AppInfoParser.MAGIC_V28,
+    29: AppInfoParser.MAGIC_V29,
+}
+
+
+def _text(rng: random.Random, size: int) -> str:
+    """Random lowercase string of roughly the given size"""
+    length = max(1, rng.randint(size // 2, size * 3 // 2))
+    return ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz ', k=length)).strip() or 'x'
+
+
+def _nested(rng: random.Random, depth: int, string_size: int) -> Dict:
+    """Nested object with depth levels below it, like appinfo's extended/ufs blocks"""
+    node = {f'key{i}': _text(rng, string_size) for i in range(3)}
+    node['flags'] = rng.randint(0, 2 ** 31 - 1)
+    if depth > 0:
+        for i in range(2):
+            node[f'child{i}'] = _nested(rng, depth - 1, string_size)
+    return node
+
+
+def generate_app(app_id: int, rng: random.Random, depth: int = 2, string_size: int = 16) -> Dict:
+    """One app with the subtrees Steam usually ships (common, config, depots, extended, ufs)"""
+    name = f"Game {app_id} {_text(rng, string_size)}"
+    return {
+        'appinfo': {
+            'appid': app_id,
+            'common': {
+                'name': name,
+                'type': rng.choice(['Game', 'DLC', 'Tool', 'Demo']),
+                'developer': _text(rng, string_size),
+                'publisher': _text(rng, string_size),
+                'steam_release_date': rng.randint(1_000_000_000, 1_700_000_000),
+                'sort_as': name.lower(),
+                'oslist': 'windows,linux',
+                'gameid': str(app_id),
+            },
+            'config': {
+                'installdir': _text(rng, string_size),
+                'launch': {
+                    str(i): {
+                        'executable': _text(rng, string_size) + '.exe',
+                        'type': 'default',
+                    }
+                    for i in range(rng.randint(1, 3))
+                },
+            },
+            'depots': {
+                str(app_id + i + 1): {
+                    'manifests': {
+                        'public': {
+                            'gid': str(rng.getrandbits(63)),
+                            'size': rng.getrandbits(40),
+                            'download': rng.getrandbits(40),
+                        }
+                    },
+                    'maxsize': rng.getrandbits(40),
+                }
+                for i in range(rng.randint(1, 4))
+            },
+            'extended': _nested(rng, depth, string_size),
+            'ufs': {
+                'quota': rng.randint(0, 2 ** 30),
+                'maxnumfiles': rng.randint(0, 1000),
+            },
+        }
+    }
+
+
+def generate_apps(count: int, depth: int = 2, string_size: int = 16, seed: int = 0) -> Dict[str, Dict]:
+    """Deterministic set of count synthetic apps"""
+    rng = random.Random(seed)
+    return {str(app_id): generate_app(app_id, rng, depth, string_size)
+            for app_id in range(10, 10 * (count + 1), 10)}
+
+
+def write_appinfo(file_path: Path, count: int, version: int = 29, depth: int = 2,
+                  string_size: int = 16, seed: int = 0) -> bool:
+    """Write a synthetic appinfo.vdf in the given format version (27, 28 or 29)"""
+    apps = generate_apps(count, depth, string_size, seed)
+    return AppInfoParser.dump(apps, file_path, VERSIONS[version])
+
+
+def main():
+    """Main generator function"""
+    parser = argparse.ArgumentParser(description="Write a synthetic appinfo.vdf")
+    parser.add_argument('output', type=Path)
+    parser.add_argument('--apps', type=int, default=1000)
+    parser.add_argument('--version', type=int, choices=sorted(VERSIONS), default=29)
+    parser.add_argument('--depth', type=int, default=2, help="nesting depth of the extended block")
+    parser.add_argument('--string-size', type=int, default=16, help="average string length")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not write_appinfo(args.output, args.apps, args.version, args.depth, args.string_size, args.seed):
+        print(f"❌ Failed to write {args.output}")
+        return 1
+
+    size_mb = args.output.stat().st_size / (1024 * 1024)
+    print(f"✅ {args.output}: {args.apps} apps, v{args.version}, {size_mb:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,6 +38,8 @@ class Config:
     
     STEAM_PATH: Optional[Path] = None
     MAX_BACKUPS: int = 5
+    # Sekunden ohne weitere Änderung, bevor gespeichert wird
+    SAVE_DELAY: float = 1.5
     TAGS_PER_GAME: int = 13
     IGNORE_COMMON_TAGS: bool = True
 
@@ -72,6 +74,7 @@ class Config:
                 self.TAGS_PER_GAME = settings.get('tags_per_game', 13)
                 self.IGNORE_COMMON_TAGS = settings.get('ignore_common_tags', True)
                 self.MAX_BACKUPS = settings.get('max_backups', 5)
+                self.SAVE_DELAY = settings.get('save_delay', 1.5)
                 
                 # User Keys aus Settings laden
                 if settings.get('steam_api_key'):
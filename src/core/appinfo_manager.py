@@ -4,43 +4,252 @@ Speichern als: src/core/appinfo_manager.py
 """
 
 import json
+import os
+import pickle
 import shutil
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime
 from src.utils.i18n import t
+from src.core.save_scheduler import synchronized
+from src.core.history_store import HistoryStore
 
 
 class AppInfoManager:
     """Verwaltet Steam's appinfo.vdf Datei"""
+
+    # Everything get_app_metadata() reads; other subtrees are skipped undecoded
+    METADATA_PATHS = [
+        ('appinfo', 'common', key)
+        for key in ('name', 'developer', 'publisher', 'steam_release_date', 'sort_as')
+    ]
+    # Metadata field -> key in appinfo.common
+    METADATA_FIELDS = {
+        'name': 'name',
+        'developer': 'developer',
+        'publisher': 'publisher',
+        'release_date': 'steam_release_date',
+        'sort_as': 'sort_as',
+    }
+    SNAPSHOT_VERSION = 2
+    DELTA_VERSION = 1
+    # Check the binary SHA1 of every record when appinfo.vdf is (re)indexed
+    VERIFY_RECORDS = True
+    MAX_BACKUPS = 10
+    # Fold the journal into metadata_changes.json once it has this many
+    # lines more than there are modifications
+    JOURNAL_COMPACT_SLACK = 500
     
-    def __init__(self, steam_path: Path):
+    def __init__(self, steam_path: Path, cache_dir: Optional[Path] = None):
         self.steam_path = steam_path
         self.appinfo_path = steam_path / 'appcache' / 'appinfo.vdf'
         self.backup_dir = steam_path / 'appcache' / 'metadata_backups'
         self.changes_file = steam_path / 'appcache' / 'metadata_changes.json'
+        # Changes since the last compaction, one JSON object per line
+        self.journal_file = steam_path / 'appcache' / 'metadata_changes.jsonl'
+        # The journal a running compaction is folding in
+        self.compacting_file = steam_path / 'appcache' / 'metadata_changes.compacting.jsonl'
+        # Serializes journal access between processes (GUI and auto_restore --watch)
+        self.journal_lock_file = steam_path / 'appcache' / 'metadata_changes.lock'
+        # Every metadata change with its time, for undo to any earlier state
+        self.history = HistoryStore(steam_path / 'appcache' / 'metadata_history.sqlite3')
         self.backup_dir.mkdir(exist_ok=True)
         self.modifications: Dict[str, Dict] = {}
+        # Journal lines not written yet, and how many the journal holds
+        self._journal_pending: List[str] = []
+        self._journal_lines = 0
+        self._journal_batches = 0
+        # State of every app touched by the open transaction(), for rollback
+        self._transaction: Optional[Dict[str, tuple]] = None
+        self._compactor = None
+        # Saves may run on the SaveScheduler thread while the UI reads
+        self._lock = threading.RLock()
+        # Header index over appinfo.vdf and the apps decoded from it so far
+        self.index = None
+        self.apps: Dict[str, Dict] = {}
+        # Apps whose record failed verification in the current file
+        self.corrupt_apps: List[str] = []
+        # Decoded apps edited since the last save
+        self._dirty: Set[str] = set()
+        # Serialized bytes and hashes of apps written by save_appinfo(data),
+        # dropped when an app is edited (spliced saves copy clean records as is)
+        self._record_cache: Dict[str, Any] = {}
+        self._metadata_projection = None
+        self._common_projection = None
+        # Field changes Steam made to apps held in memory, found by the last refresh
+        self.overwritten: Dict[str, Dict[str, tuple]] = {}
+        # Extracted metadata of unmodified apps, persisted as snapshot in cache_dir
+        self.cache_dir = cache_dir
+        self.metadata: Dict[str, tuple] = {}
+        # (change_number, sha1) of the records self.metadata was taken from,
+        # used while the index is not open
+        self._fingerprints: Dict[str, tuple] = {}
+        # Asked-for app ids appinfo.vdf does not have, persisted with the snapshot
+        self._missing: Set[str] = set()
+        self._snapshot_loaded = False
+        self._snapshot_dirty = False
         self._load_modifications()
     
     def _load_modifications(self):
-        if self.changes_file.exists():
+        """metadata_changes.json as of the last compaction, then the journal replayed over it"""
+        try:
+            with self._journal_lock():
+                # A compaction that did not finish left its journal behind;
+                # replaying it again is harmless
+                interrupted = self.compacting_file.exists()
+                self.modifications, self._journal_lines = self._read_modifications()
+            if interrupted and self._fold_journal():
+                self._journal_lines = 0
+            print(t('logs.appinfo.loaded', count=len(self.modifications)))
+        except Exception as e:
+            print(t('logs.appinfo.error', error=e))
+            self.modifications = {}
+
+    @contextmanager
+    def _journal_lock(self):
+        """Exclusive lock on the journal files, shared by every process using them"""
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(self.journal_lock_file, 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
             try:
-                with open(self.changes_file, 'r', encoding='utf-8') as f:
-                    self.modifications = json.load(f)
-                print(t('logs.appinfo.loaded', count=len(self.modifications)))
-            except Exception as e:
-                print(t('logs.appinfo.error', error=e))
-                self.modifications = {}
-    
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _read_modifications(self) -> tuple:
+        """Modifications as on disk and the number of journal lines (hold _journal_lock)"""
+        modifications = {}
+        if self.changes_file.exists():
+            with open(self.changes_file, 'r', encoding='utf-8') as f:
+                modifications = json.load(f)
+        lines = sum(self._replay_journal(path, modifications)
+                    for path in (self.compacting_file, self.journal_file))
+        return modifications, lines
+
+    def _replay_journal(self, path: Path, modifications: Dict[str, Dict]) -> int:
+        if not path.exists():
+            return 0
+        lines = 0
+        valid = 0
+        with open(path, 'r+b') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line of an interrupted write; cut it off so
+                    # lines appended later are not hidden behind it
+                    f.truncate(valid)
+                    break
+                valid += len(line)
+                lines += 1
+                if entry.get('clear'):
+                    modifications.clear()
+                elif entry.get('modification') is None:
+                    modifications.pop(entry['app_id'], None)
+                else:
+                    modifications[entry['app_id']] = entry['modification']
+        return lines
+
+    def _journal(self, app_id: Optional[str] = None):
+        """Queue the current state of app_id (None: all cleared) for the journal"""
+        if app_id is None:
+            entry = {'clear': True}
+        else:
+            entry = {'app_id': app_id, 'modification': self.modifications.get(app_id)}
+        self._journal_pending.append(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    @contextmanager
+    def _journal_batch(self):
+        """Write the journal lines of everything inside the block with a single fsync"""
+        self._journal_batches += 1
+        try:
+            yield
+        finally:
+            self._journal_batches -= 1
+            self._save_modifications()
+
     def _save_modifications(self):
+        """Append the queued journal lines (deferred while a batch is open)"""
+        if self._journal_batches or not self._journal_pending:
+            return
         try:
-            with open(self.changes_file, 'w', encoding='utf-8') as f:
-                json.dump(self.modifications, f, indent=2)
+            with self._journal_lock(), open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.writelines(self._journal_pending)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_lines += len(self._journal_pending)
+            self._journal_pending = []
             print(t('logs.appinfo.saved_mods', count=len(self.modifications)))
         except Exception as e:
             print(t('logs.appinfo.save_error', error=e))
-    
+            return
+        try:
+            self.history.flush()
+        except Exception as e:
+            print(t('logs.appinfo.history_error', error=e))
+        if self._journal_lines > len(self.modifications) + self.JOURNAL_COMPACT_SLACK:
+            self._compact_journal()
+
+    def _compact_journal(self):
+        """Fold the journal into metadata_changes.json on a background thread"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._journal_lines = 0
+        self._compactor = threading.Thread(target=self._fold_journal, name="JournalCompactor", daemon=True)
+        self._compactor.start()
+
+    def _fold_journal(self) -> bool:
+        """
+        Move the journal into metadata_changes.json; False on failure
+
+        The result is built from the files, not from self.modifications,
+        so lines another process appended are kept even if this process
+        never saw them.
+        """
+        with self._journal_lock():
+            try:
+                if self.journal_file.exists():
+                    if self.compacting_file.exists():
+                        # An earlier compaction failed and its lines are not
+                        # in metadata_changes.json yet: add the new ones to them
+                        with open(self.journal_file, 'rb') as src, open(self.compacting_file, 'ab') as dst:
+                            shutil.copyfileobj(src, dst)
+                            dst.flush()
+                            os.fsync(dst.fileno())
+                        self.journal_file.unlink()
+                    else:
+                        os.replace(self.journal_file, self.compacting_file)
+                modifications, _ = self._read_modifications()
+            except Exception as e:
+                print(t('logs.appinfo.save_error', error=e))
+                return False
+            return self._write_compacted(modifications)
+
+    def _write_compacted(self, modifications: Dict[str, Dict]) -> bool:
+        """Write metadata_changes.json and drop the folded-in journal; False on failure"""
+        tmp_path = self.changes_file.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(modifications, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.changes_file)
+        except Exception as e:
+            print(t('logs.appinfo.save_error', error=e))
+            tmp_path.unlink(missing_ok=True)
+            return False
+        self.compacting_file.unlink(missing_ok=True)
+        return True
+
+    @synchronized
     def load_appinfo(self) -> Dict:
         if not self.appinfo_path.exists():
             print(t('logs.appinfo.file_not_found', path=self.appinfo_path))
@@ -56,12 +265,97 @@ class AppInfoManager:
             traceback.print_exc()
             return {}
     
-    def save_appinfo(self, data: Dict, create_backup: bool = True) -> bool:
+    @synchronized
+    def close(self):
+        """Release the mapping of appinfo.vdf and the history database"""
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        self.history.close()
+
+    @synchronized
+    def load_index(self) -> bool:
+        """Index appinfo.vdf; apps are decoded later, when first accessed"""
+        if not self.appinfo_path.exists():
+            print(t('logs.appinfo.file_not_found', path=self.appinfo_path))
+            return False
+        try:
+            from src.utils.appinfo_vdf_parser import AppInfoIndex
+            if self.index is not None:
+                self.index.close()
+            self.index = AppInfoIndex(self.appinfo_path).open()
+            self.apps = {}
+            self._dirty = set()
+            self._record_cache = {}
+            print(t('logs.appinfo.index_loaded', count=len(self.index)))
+            self.corrupt_apps = []
+            if self.VERIFY_RECORDS:
+                self._verify_records()
+            return True
+        except Exception as e:
+            print(t('logs.appinfo.vdf_load_error', error=e))
+            import traceback
+            traceback.print_exc()
+            self.index = None
+            return False
+
+    def _verify_records(self, app_ids=None):
+        corrupt = self.index.verify(app_ids)
+        if corrupt:
+            self.corrupt_apps.extend(corrupt)
+            print(t('logs.appinfo.corrupt', count=len(corrupt), ids=', '.join(sorted(corrupt, key=int)[:20])))
+
+    def _get_app(self, app_id: str, data: Optional[Dict] = None, paths=None) -> Optional[Dict]:
+        if data is not None:
+            return data.get(app_id)
+        if app_id not in self.apps:
+            if self.index is None and not self.load_index():
+                return None
+            if app_id not in self.index:
+                return None
+            if paths is not None:
+                # Partial apps are read-only views and never cached
+                return self.index.get_app(app_id, paths)
+            self.apps[app_id] = self.index.get_app(app_id)
+        return self.apps[app_id]
+
+    @synchronized
+    def save_appinfo(self, data: Optional[Dict] = None, create_backup: bool = True) -> bool:
+        if data is None and self.index is None:
+            print(t('logs.appinfo.not_loaded'))
+            return False
+        if data is None and not self._dirty:
+            # Nothing edited: no backup, no write
+            return True
+        delta_path = None
         if create_backup:
-            self._create_backup()
+            if data is None:
+                # Only the records this save replaces need to be kept
+                delta_path = self._create_delta_backup(self._dirty)
+            else:
+                self._create_backup()
         try:
             from src.utils.vdf_wrapper import AppInfoVDF
-            if AppInfoVDF.dump(data, self.appinfo_path):
+            from src.utils.appinfo_vdf_parser import AppInfoParser
+            if data is None:
+                # Only apps edited through this manager are serialized again,
+                # all other records are copied from the current file
+                dirty = {app_id: self.apps[app_id] for app_id in self._dirty if app_id in self.apps}
+                saved = self._save_spliced(dirty)
+                if saved:
+                    if delta_path is not None:
+                        self._finish_delta_backup(delta_path)
+                    self._dirty.clear()
+                    # Written apps now match the file again
+                    for app_id, app in self.apps.items():
+                        self.metadata[app_id] = self._extract_metadata(app)
+                    self._snapshot_dirty = True
+                    self.save_snapshot()
+            else:
+                # Keep the format Steam wrote (v29 needs its key string table)
+                version = AppInfoParser.read_version(self.appinfo_path)
+                saved = AppInfoVDF.dump(data, self.appinfo_path, version, record_cache=self._record_cache)
+            if saved:
                 print(t('logs.appinfo.saved_vdf'))
                 return True
             else:
@@ -72,53 +366,424 @@ class AppInfoManager:
             traceback.print_exc()
             return False
     
+    def _save_spliced(self, apps: Dict[str, Dict], records: Optional[Dict[str, bytes]] = None) -> bool:
+        """Rewrite the given apps (or raw records) and copy everything else"""
+        from src.utils.vdf_wrapper import AppInfoVDF
+        tmp_path = self.appinfo_path.with_name(self.appinfo_path.name + '.tmp')
+        if not AppInfoVDF.dump_spliced(self.index, apps, tmp_path, records):
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return False
+        # The mapping has to go before the file is replaced
+        self.index.close()
+        try:
+            os.replace(tmp_path, self.appinfo_path)
+        finally:
+            self.index.open()
+        return True
+
+    def _create_delta_backup(self, app_ids) -> Optional[Path]:
+        """
+        Back up only the records of app_ids, as they are on disk now
+
+        A delta holds the raw records plus the identity of the file before
+        ('base') and after ('result') the save, so its size and cost follow
+        the number of edited apps instead of the size of appinfo.vdf.
+        """
+        app_ids = [app_id for app_id in app_ids if app_id in self.index]
+        if not app_ids:
+            return None
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        path = self.backup_dir / f'appinfo_delta_{timestamp}.pickle'
+        try:
+            delta = {
+                'version': self.DELTA_VERSION,
+                'timestamp': datetime.now().isoformat(),
+                'magic': self.index.version,
+                'base': self._file_identity(),
+                'result': None,
+                'records': {app_id: self.index.get_record(app_id) for app_id in app_ids},
+                'strings': self.index.record_strings(app_ids),
+            }
+            self._write_delta(path, delta)
+            print(t('logs.appinfo.delta_created', path=path.name, count=len(app_ids)))
+            self._cleanup_old_backups()
+            return path
+        except Exception as e:
+            print(t('logs.appinfo.backup_error', name=path.name, error=e))
+            return None
+
+    def _finish_delta_backup(self, path: Path):
+        """Record which file the save that path belongs to produced"""
+        try:
+            delta = self._read_delta(path)
+            delta['result'] = self._file_identity()
+            self._write_delta(path, delta)
+        except Exception as e:
+            print(t('logs.appinfo.backup_error', name=path.name, error=e))
+
+    def _read_delta(self, path: Path) -> Dict:
+        with open(path, 'rb') as f:
+            delta = pickle.load(f)
+        if delta.get('version') != self.DELTA_VERSION:
+            raise ValueError(f"Unsupported delta backup version in {path.name}")
+        return delta
+
+    def _write_delta(self, path: Path, delta: Dict):
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(delta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def get_delta_backups(self) -> List[Path]:
+        """Delta backups, oldest first"""
+        return sorted(self.backup_dir.glob('appinfo_delta_*.pickle'))
+
+    @synchronized
+    def restore_delta_backup(self, delta_path: Path, create_backup: bool = True) -> int:
+        """
+        Bring appinfo.vdf back to its state before the save of delta_path
+
+        Every newer delta is undone as well: of each app the record from the
+        oldest delta in that range is spliced back in. Records that still fit
+        the current string table are copied as they are, others are decoded
+        and written again. Returns the number of restored apps.
+        """
+        if self.index is None and not self.load_index():
+            return 0
+        try:
+            from src.utils.appinfo_vdf_parser import AppInfoParser
+            deltas = [self._read_delta(path) for path in self.get_delta_backups()
+                      if path.name >= delta_path.name]
+            if not deltas:
+                return 0
+            if deltas[-1]['result'] != self._file_identity():
+                print(t('logs.appinfo.delta_base_changed'))
+
+            records = {}
+            for delta in reversed(deltas):
+                for app_id, record in delta['records'].items():
+                    records[app_id] = (delta, record)
+
+            raw = {}
+            apps = {}
+            for app_id, (delta, record) in records.items():
+                if self.index.accepts_records(delta['magic'], delta['strings']):
+                    raw[app_id] = record
+                else:
+                    _, _, apps[app_id] = AppInfoParser.decode_record(record, delta['magic'], delta['strings'])
+
+            # Restoring is a save as well and can be undone the same way
+            undo_path = self._create_delta_backup(records) if create_backup else None
+            if not self._save_spliced(apps, raw):
+                return 0
+            if undo_path is not None:
+                self._finish_delta_backup(undo_path)
+
+            for app_id in records:
+                self.apps.pop(app_id, None)
+                self._dirty.discard(app_id)
+                self._record_cache.pop(app_id, None)
+                self.metadata.pop(app_id, None)
+            self._snapshot_dirty = True
+            self.save_snapshot()
+            print(t('logs.appinfo.delta_restored', count=len(records)))
+            return len(records)
+        except Exception as e:
+            print(t('logs.appinfo.vdf_save_error', error=e))
+            import traceback
+            traceback.print_exc()
+            return 0
+
     def _create_backup(self):
         if not self.appinfo_path.exists():
             return
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_path = self.backup_dir / f'appinfo_backup_{timestamp}.vdf'
         try:
-            shutil.copy2(self.appinfo_path, backup_path)
+            from src.core.backup_manager import BackupManager
+            # Saves rename a new file over appinfo.vdf, so the current one
+            # can be linked instead of copied
+            BackupManager.clone_file(self.appinfo_path, backup_path, allow_link=True)
             print(t('logs.appinfo.backup_created', path=backup_path.name))
             self._cleanup_old_backups()
         except Exception as e:
             print(t('logs.appinfo.backup_error', name="create", error=e))
     
     def _cleanup_old_backups(self):
-        backups = sorted(self.backup_dir.glob('appinfo_backup_*.vdf'))
-        if len(backups) > 10:
-            for old_backup in backups[:-10]:
+        for pattern in ('appinfo_backup_*.vdf', 'appinfo_delta_*.pickle'):
+            self._cleanup_backups(sorted(self.backup_dir.glob(pattern)))
+
+    def _cleanup_backups(self, backups: List[Path]):
+        if len(backups) > self.MAX_BACKUPS:
+            for old_backup in backups[:-self.MAX_BACKUPS]:
                 try:
                     old_backup.unlink()
                     print(t('logs.appinfo.backup_removed', name=old_backup.name))
                 except Exception as e:
                     print(t('logs.appinfo.backup_error', name=old_backup.name, error=e))
     
-    def get_app_metadata(self, app_id: str, data: Dict) -> Optional[Dict]:
-        if app_id not in data:
-            return None
-        app = data[app_id]
+    def _snapshot_path(self) -> Path:
+        cache_dir = self.cache_dir
+        if cache_dir is None:
+            from src.config import config
+            cache_dir = config.CACHE_DIR
+        return cache_dir / 'appinfo_snapshot.pickle'
+
+    def _file_identity(self) -> tuple:
+        stat = self.appinfo_path.stat()
+        return str(self.appinfo_path), stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _load_snapshot(self):
+        """Load the metadata snapshot if it still matches appinfo.vdf"""
+        self._snapshot_loaded = True
+        path = self._snapshot_path()
+        if not path.exists() or not self.appinfo_path.exists():
+            return
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+            if snapshot.get('version') != self.SNAPSHOT_VERSION:
+                return
+            if snapshot.get('identity') == self._file_identity():
+                self.metadata = snapshot['apps']
+                self._fingerprints = snapshot['fingerprints']
+                # Only valid for this very file; a rewrite may add the apps
+                self._missing = set(snapshot.get('missing', ()))
+                print(t('logs.appinfo.snapshot_loaded', count=len(self.metadata)))
+            elif self.index is not None or self.load_index():
+                # Steam rewrote the file: keep every app whose record is unchanged
+                changed = self.index.changed_since(snapshot['fingerprints'])
+                self.metadata = {app_id: values for app_id, values in snapshot['apps'].items()
+                                 if app_id not in changed}
+                self._snapshot_dirty = True
+                print(t('logs.appinfo.snapshot_reused', count=len(self.metadata),
+                        changed=len(snapshot['apps']) - len(self.metadata)))
+        except Exception as e:
+            print(t('logs.appinfo.snapshot_error', error=e))
+
+    @synchronized
+    def save_snapshot(self):
+        """Persist extracted metadata, keyed on the identity of appinfo.vdf"""
+        if not self._snapshot_dirty or not self.appinfo_path.exists():
+            return
+        path = self._snapshot_path()
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            fingerprints = self.index.fingerprints if self.index is not None else self._fingerprints
+            snapshot = {
+                'version': self.SNAPSHOT_VERSION,
+                'identity': self._file_identity(),
+                'apps': self.metadata,
+                'fingerprints': {app_id: fingerprints.get(app_id) for app_id in self.metadata},
+                'missing': self._missing,
+            }
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._snapshot_dirty = False
+        except Exception as e:
+            print(t('logs.appinfo.snapshot_error', error=e))
+
+    @synchronized
+    def refresh_appinfo(self) -> List[str]:
+        """
+        Pick up changes Steam made to appinfo.vdf since it was indexed
+
+        Only records whose change number or SHA1 differ are dropped from the
+        caches, and only the metadata of those is decoded again.
+        Returns the changed app ids.
+        """
+        if self.index is None:
+            self.load_index()
+            return []
+        try:
+            changed = self.index.refresh()
+        except Exception as e:
+            print(t('logs.appinfo.vdf_load_error', error=e))
+            self.index = None
+            return []
+        if self.VERIFY_RECORDS:
+            # Unchanged records were already checked, except the damaged ones
+            recheck = set(changed).union(self.corrupt_apps)
+            self.corrupt_apps = []
+            self._verify_records(recheck)
+        refetch = []
+        previous = {}
+        metadata_keys = set(self.METADATA_FIELDS.values())
+        for app_id in changed:
+            # Added apps show up as changed
+            self._missing.discard(app_id)
+            app = self.apps.pop(app_id, None)
+            self._dirty.discard(app_id)
+            self._record_cache.pop(app_id, None)
+            values = self.metadata.pop(app_id, None)
+            if values is not None:
+                refetch.append(app_id)
+            if app is not None:
+                previous[app_id] = (app, None)
+            elif values is not None:
+                common = {key: value for key, value in zip(self.METADATA_FIELDS.values(), values) if value != ''}
+                previous[app_id] = ({'appinfo': {'common': common}}, metadata_keys)
+        if changed:
+            self._snapshot_dirty = True
+        self.overwritten = self._diff_against_disk(previous)
+        self.prefetch_metadata(refetch)
+        print(t('logs.appinfo.refreshed', count=len(changed)))
+        return sorted(changed)
+
+    def _common_paths(self):
+        if self._common_projection is None:
+            from src.utils.appinfo_vdf_parser import AppInfoParser
+            self._common_projection = AppInfoParser.compile_paths([AppInfoParser.COMMON_PATH])
+        return self._common_projection
+
+    def _diff_against_disk(self, apps: Dict[str, tuple]) -> Dict[str, Dict[str, tuple]]:
+        """
+        Field changes from each (app, keys) in apps to its record in the index
+
+        keys limits the comparison to those common keys (None: all of them).
+        """
+        from src.utils.appinfo_vdf_parser import AppInfoParser
+        changes = {}
+        for app_id in sorted(apps, key=int):
+            app, keys = apps[app_id]
+            disk = self.index.get_app(app_id, self._common_paths()) if app_id in self.index else None
+            fields = AppInfoParser.diff_common(app, disk)
+            if keys is not None:
+                fields = {key: values for key, values in fields.items() if key in keys}
+            if fields:
+                changes[app_id] = fields
+        return changes
+
+    @synchronized
+    def preview_save(self) -> Dict[str, Dict[str, tuple]]:
+        """
+        What the next save_appinfo() would change under appinfo.common
+
+        Only the common block of each edited app is decoded from the file.
+        Returns {app_id: {key: (on_disk, new)}}.
+        """
+        if self.index is None:
+            return {}
+        from src.utils.appinfo_vdf_parser import AppInfoParser
+        changes = {}
+        for app_id in sorted(self._dirty, key=int):
+            app = self.apps.get(app_id)
+            if app is None:
+                continue
+            disk = self.index.get_app(app_id, self._common_paths())
+            fields = AppInfoParser.diff_common(disk, app)
+            if fields:
+                changes[app_id] = fields
+        return changes
+
+    @synchronized
+    def diff_backup(self, backup_path: Path) -> Dict[str, Dict[str, tuple]]:
+        """
+        What changed under appinfo.common between a backup and appinfo.vdf
+
+        backup_path is a full backup (.vdf) or a delta backup (.pickle).
+        Records are matched by their stored SHA1 first, only differing ones
+        are decoded. Returns {app_id: {key: (in_backup, current)}}.
+        """
+        if self.index is None and not self.load_index():
+            return {}
+        from src.utils.appinfo_vdf_parser import AppInfoIndex, AppInfoParser
+        try:
+            if backup_path.suffix != '.pickle':
+                with AppInfoIndex(backup_path) as backup:
+                    return backup.diff(self.index)
+
+            delta = self._read_delta(backup_path)
+            has_binary_hash = delta['magic'] >= AppInfoParser.MAGIC_V28
+            changes = {}
+            for app_id in sorted(delta['records'], key=int):
+                record = delta['records'][app_id]
+                current = self.index.fingerprints.get(app_id)
+                if current is not None and current[1] == AppInfoParser._read_header(record, 0, has_binary_hash).sha1:
+                    continue
+                _, _, old = AppInfoParser.decode_record(record, delta['magic'], delta['strings'])
+                disk = self.index.get_app(app_id, self._common_paths()) if app_id in self.index else None
+                fields = AppInfoParser.diff_common(old, disk)
+                if fields:
+                    changes[app_id] = fields
+            return changes
+        except Exception as e:
+            print(t('logs.appinfo.backup_error', name=backup_path.name, error=e))
+            return {}
+
+    def _extract_metadata(self, app: Dict) -> tuple:
         common = app.get('appinfo', {}).get('common', {})
-        return {
-            'name': common.get('name', ''),
-            'developer': common.get('developer', ''),
-            'publisher': common.get('publisher', ''),
-            'release_date': common.get('steam_release_date', ''),
-            'sort_as': common.get('sort_as', ''),
-            'app_id': app_id,
-        }
+        return tuple(common.get(key, '') for key in self.METADATA_FIELDS.values())
+
+    @synchronized
+    def prefetch_metadata(self, app_ids) -> int:
+        """
+        Make metadata of the given (owned) apps available
+
+        Served from the snapshot when appinfo.vdf is unchanged; otherwise
+        only the missing apps are decoded and the snapshot is rewritten.
+        Returns the number of apps that had to be decoded.
+        """
+        if not self._snapshot_loaded:
+            self._load_snapshot()
+        decoded = 0
+        for app_id in app_ids:
+            if app_id in self.metadata or app_id in self.apps or app_id in self._missing:
+                continue
+            if self.get_app_metadata(app_id) is not None:
+                decoded += 1
+        self.save_snapshot()
+        return decoded
+
+    @synchronized
+    def get_app_metadata(self, app_id: str, data: Optional[Dict] = None) -> Optional[Dict]:
+        if data is None and app_id not in self.apps and app_id in self.metadata:
+            values = self.metadata[app_id]
+        elif data is None and app_id in self._missing:
+            return None
+        else:
+            if self._metadata_projection is None:
+                from src.utils.appinfo_vdf_parser import AppInfoParser
+                self._metadata_projection = AppInfoParser.compile_paths(self.METADATA_PATHS)
+            app = self._get_app(app_id, data, self._metadata_projection)
+            if app is None:
+                if data is None and self.index is not None and app_id not in self.index:
+                    self._missing.add(app_id)
+                    self._snapshot_dirty = True
+                return None
+            values = self._extract_metadata(app)
+            if data is None and app_id not in self.apps:
+                self.metadata[app_id] = values
+                self._snapshot_dirty = True
+
+        metadata = dict(zip(self.METADATA_FIELDS, values))
+        metadata['app_id'] = app_id
+        return metadata
     
-    def set_app_metadata(self, app_id: str, data: Dict, metadata: Dict) -> bool:
-        if app_id not in data:
+    @synchronized
+    def set_app_metadata(self, app_id: str, metadata: Dict, data: Optional[Dict] = None) -> bool:
+        app = self._get_app(app_id, data)
+        if app is None:
             print(t('logs.appinfo.not_found', app_id=app_id))
             return False
+        if self._transaction is not None and app_id not in self._transaction:
+            self._stage(app_id, app)
         try:
-            if 'appinfo' not in data[app_id]:
-                data[app_id]['appinfo'] = {}
-            if 'common' not in data[app_id]['appinfo']:
-                data[app_id]['appinfo']['common'] = {}
+            if 'appinfo' not in app:
+                app['appinfo'] = {}
+            if 'common' not in app['appinfo']:
+                app['appinfo']['common'] = {}
             
-            common = data[app_id]['appinfo']['common']
+            self._record_cache.pop(app_id, None)
+            if data is None:
+                self._dirty.add(app_id)
+                if self.metadata.pop(app_id, None) is not None:
+                    # Snapshot only describes what is on disk
+                    self._snapshot_dirty = True
+
+            common = app['appinfo']['common']
             original = {
                 'name': common.get('name'),
                 'developer': common.get('developer'),
@@ -144,43 +809,212 @@ class AppInfoManager:
             if 'sort_as' in metadata and metadata['sort_as']:
                 common['sort_as'] = metadata['sort_as']
             
+            timestamp = datetime.now()
+            for field, key in self.METADATA_FIELDS.items():
+                if common.get(key) != original[field]:
+                    self.history.record(app_id, 'metadata', field, original[field], common.get(key), timestamp)
             self.modifications[app_id] = {
                 'original': original,
                 'modified': metadata,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp.isoformat()
             }
+            self._journal(app_id)
             self._save_modifications()
             return True
         except Exception as e:
             print(t('logs.appinfo.set_error', app_id=app_id, error=e))
             return False
     
-    def bulk_set_metadata(self, app_ids: List[str], data: Dict, metadata: Dict) -> int:
+    @synchronized
+    def bulk_set_metadata(self, app_ids: List[str], metadata: Dict, data: Optional[Dict] = None) -> int:
         success_count = 0
-        for app_id in app_ids:
-            if self.set_app_metadata(app_id, data, metadata):
-                success_count += 1
+        with self._journal_batch():
+            for app_id in app_ids:
+                if self.set_app_metadata(app_id, metadata, data):
+                    success_count += 1
         return success_count
     
-    def restore_modifications(self, data: Dict) -> int:
+    @contextmanager
+    def transaction(self, save: bool = True):
+        """
+        Apply a batch of metadata edits as one unit
+
+        set_app_metadata() calls inside the block only change memory. At the
+        end the edited values are validated once, appinfo.vdf is saved once
+        (unless save is False) and the journal gets all lines with a single
+        fsync. If the block raises, validation fails or the save fails, every
+        edit made inside it is rolled back and the error is raised.
+        Transactions nest; inner ones become part of the outermost.
+        """
+        with self._lock:
+            if self._transaction is not None:
+                yield self
+                return
+            self._transaction = {}
+            self._journal_batches += 1
+            journal_mark = len(self._journal_pending)
+            history_mark = self.history.mark()
+            try:
+                yield self
+                self._validate_staged()
+                if save and self._dirty.intersection(self._transaction) and not self.save_appinfo():
+                    raise RuntimeError(t('logs.appinfo.transaction_failed'))
+            except BaseException:
+                del self._journal_pending[journal_mark:]
+                self.history.discard_since(history_mark)
+                self._rollback()
+                raise
+            finally:
+                self._transaction = None
+                self._journal_batches -= 1
+            self._save_modifications()
+
+    def _stage(self, app_id: str, app: Dict):
+        """Remember everything set_app_metadata() is about to change of app_id"""
+        appinfo = app.get('appinfo')
+        common = appinfo.get('common') if appinfo is not None else None
+        self._transaction[app_id] = (
+            app, appinfo is not None, dict(common) if common is not None else None,
+            self.modifications.get(app_id), app_id in self._dirty,
+            self.metadata.get(app_id), self._record_cache.get(app_id),
+        )
+
+    def _validate_staged(self):
+        """Staged values must be something the appinfo writer can store"""
+        for app_id, staged in self._transaction.items():
+            common = staged[0].get('appinfo', {}).get('common', {})
+            for key in self.METADATA_FIELDS.values():
+                value = common.get(key)
+                if value is not None and not isinstance(value, (str, int)):
+                    raise ValueError(f"Invalid {key} for app {app_id}: {value!r}")
+
+    def _rollback(self):
+        for app_id, staged in self._transaction.items():
+            app, had_appinfo, common, modification, dirty, values, cached = staged
+            if common is not None:
+                app['appinfo']['common'].clear()
+                app['appinfo']['common'].update(common)
+            elif had_appinfo:
+                app['appinfo'].pop('common', None)
+            else:
+                app.pop('appinfo', None)
+            if modification is not None:
+                self.modifications[app_id] = modification
+            else:
+                self.modifications.pop(app_id, None)
+            if not dirty:
+                self._dirty.discard(app_id)
+            if values is not None:
+                self.metadata[app_id] = values
+            if cached is not None:
+                self._record_cache[app_id] = cached
+        print(t('logs.appinfo.transaction_rolled_back', count=len(self._transaction)))
+
+    @synchronized
+    def restore_modifications(self, data: Optional[Dict] = None) -> int:
+        """
+        Reapply tracked modifications that appinfo no longer holds
+
+        Apps whose metadata already matches are not touched, so when nothing
+        differs no app becomes dirty and save_appinfo() has nothing to write.
+        Returns the number of apps that were changed.
+        """
         if not self.modifications:
             print(t('logs.appinfo.no_restore'))
             return 0
         print(t('logs.appinfo.restoring', count=len(self.modifications)))
         restored = 0
-        for app_id, mod in self.modifications.items():
-            if self.set_app_metadata(app_id, data, mod['modified']):
-                restored += 1
+        with self._journal_batch():
+            for app_id, mod in self.modifications.items():
+                if self._modification_applied(app_id, mod['modified'], data):
+                    continue
+                if self.set_app_metadata(app_id, mod['modified'], data):
+                    restored += 1
         print(t('logs.appinfo.restored', count=restored))
         return restored
     
-    def revert_app(self, app_id: str, data: Dict) -> bool:
+    def _modification_applied(self, app_id: str, modified: Dict, data: Optional[Dict] = None) -> bool:
+        """Whether appinfo still holds the values of a tracked modification (or lost the app)"""
+        current = self.get_app_metadata(app_id, data)
+        if current is None:
+            return True
+        for field, value in modified.items():
+            if field in self.METADATA_FIELDS and value and str(current.get(field)) != str(value):
+                return False
+        return True
+
+    @synchronized
+    def restore_overwritten(self, reload: bool = False) -> int:
+        """
+        Reapply the tracked modifications Steam has reverted
+
+        After the first call only tracked apps whose record changed since
+        the last one are looked at, and of those only the metadata fields
+        are decoded. Apps that still carry their modified values are left
+        alone, the others are patched and saved in one transaction.
+        reload re-reads the tracked modifications first, for long-running
+        callers while other processes may edit them.
+        Returns the number of reapplied apps.
+        """
+        if reload:
+            self._load_modifications()
+        if not self.modifications:
+            return 0
+        if self.index is None:
+            if not self.load_index():
+                return 0
+            candidates = list(self.modifications)
+        else:
+            candidates = [app_id for app_id in self.refresh_appinfo() if app_id in self.modifications]
+        reverted = [app_id for app_id in candidates
+                    if not self._modification_applied(app_id, self.modifications[app_id]['modified'])]
+        if not reverted:
+            return 0
+        with self.transaction():
+            for app_id in reverted:
+                self.set_app_metadata(app_id, self.modifications[app_id]['modified'])
+        print(t('logs.appinfo.reapplied', count=len(reverted)))
+        return len(reverted)
+
+    @synchronized
+    def revert_to(self, when: datetime, app_ids: Optional[List[str]] = None) -> int:
+        """
+        Bring metadata back to what it was at when
+
+        Looks up the apps changed after when (or the given ones) in the
+        history and sets their recorded fields to the values they had then,
+        in one transaction. Apps that had not been modified at that time stop
+        being tracked. Returns the number of changed apps.
+        """
+        if app_ids is None:
+            app_ids = self.history.apps_changed_since(when, 'metadata')
+        reverted = 0
+        with self.transaction():
+            for app_id in app_ids:
+                values = self.history.values_at(app_id, 'metadata', when)
+                current = self.get_app_metadata(app_id)
+                if current is None:
+                    continue
+                if any(value and str(current.get(field)) != str(value) for field, value in values.items()):
+                    if self.set_app_metadata(app_id, values):
+                        reverted += 1
+                if app_id in self.modifications and not self.history.changed_before(app_id, 'metadata', when):
+                    if app_id not in self._transaction:
+                        self._stage(app_id, self._get_app(app_id))
+                    del self.modifications[app_id]
+                    self._journal(app_id)
+        print(t('logs.appinfo.reverted_to', count=reverted, time=when.isoformat(timespec='seconds')))
+        return reverted
+
+    @synchronized
+    def revert_app(self, app_id: str, data: Optional[Dict] = None) -> bool:
         if app_id not in self.modifications:
             print(t('logs.appinfo.no_mods_app', app_id=app_id))
             return False
         original = self.modifications[app_id]['original']
-        if self.set_app_metadata(app_id, data, original):
+        if self.set_app_metadata(app_id, original, data):
             del self.modifications[app_id]
+            self._journal(app_id)
             self._save_modifications()
             print(t('logs.appinfo.reverted', app_id=app_id))
             return True
@@ -192,7 +1026,9 @@ class AppInfoManager:
     def get_modified_apps(self) -> List[str]:
         return list(self.modifications.keys())
     
+    @synchronized
     def clear_all_modifications(self):
         self.modifications = {}
+        self._journal()
         self._save_modifications()
         print(t('logs.appinfo.cleared'))
@@ -0,0 +1,130 @@
+"""
+AppInfo Watcher - Reagiert auf Änderungen an appinfo.vdf
+Speichern als: src/core/appinfo_watcher.py
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+from src.utils.i18n import t
+
+
+class AppInfoWatcher:
+    """
+    Calls a function whenever a file was rewritten
+
+    Uses inotify on the file's directory where available (Steam replaces
+    appinfo.vdf by renaming a new file over it, which a watch on the file
+    itself would miss) and otherwise polls its mtime, size and inode. The
+    callback runs once the file has been quiet for settle seconds, so a
+    burst of writes by Steam triggers it only once.
+    """
+
+    # inotify(7)
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    _EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+    def __init__(self, file_path: Path, callback: Callable[[], None],
+                 interval: float = 2.0, settle: float = 1.0):
+        self.file_path = file_path
+        self.callback = callback
+        self.interval = interval
+        self.settle = settle
+        self.mode = None
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Make run() return (from another thread or a signal handler)"""
+        self._stop.set()
+
+    def run(self):
+        """Watch until stop() is called"""
+        fd = self._open_inotify()
+        try:
+            self.mode = 'inotify' if fd is not None else 'polling'
+            print(t('logs.appinfo.watch_started', path=self.file_path, mode=self.mode))
+            if fd is not None:
+                self._watch_inotify(fd)
+            else:
+                self._watch_polling()
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _notify(self):
+        try:
+            self.callback()
+        except Exception as e:
+            print(t('logs.appinfo.watch_error', error=e))
+
+    def _open_inotify(self) -> Optional[int]:
+        """inotify descriptor watching the file's directory; None where unsupported"""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(fd, str(self.file_path.parent).encode(), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _read_events(self, fd: int) -> bool:
+        """Drain pending events; True if one of them concerns the watched file"""
+        name = os.fsencode(self.file_path.name)
+        hit = False
+        while True:
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                return hit
+            pos = 0
+            while pos < len(data):
+                _, _, _, length = self._EVENT_HEADER.unpack_from(data, pos)
+                pos += self._EVENT_HEADER.size
+                if data[pos:pos + length].rstrip(b'\0') == name:
+                    hit = True
+                pos += length
+
+    def _watch_inotify(self, fd: int):
+        pending = False
+        while not self._stop.is_set():
+            # Wake up regularly to notice stop()
+            timeout = self.settle if pending else self.interval
+            readable, _, _ = select.select([fd], [], [], timeout)
+            if readable:
+                if self._read_events(fd):
+                    pending = True
+            elif pending:
+                pending = False
+                self._notify()
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = self.file_path.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _watch_polling(self):
+        last = self._stat()
+        changed_at = None
+        while not self._stop.wait(min(self.interval, self.settle) if changed_at else self.interval):
+            current = self._stat()
+            if current != last:
+                last = current
+                changed_at = time.monotonic()
+            elif changed_at is not None and time.monotonic() - changed_at >= self.settle:
+                changed_at = None
+                if current is not None:
+                    self._notify()
@@ -2,42 +2,173 @@
 Backup Manager - Handles Rolling Backups (No Hardcoded Strings)
 Speichern als: src/core/backup_manager.py
 """
+import atexit
+import itertools
+import lzma
+import queue
 import shutil
 import os
+import threading
 from pathlib import Path
 from datetime import datetime
 from src.config import config
 from src.utils.i18n import t
 
 class BackupManager:
+
+    # Linux FICLONE ioctl: share all extents of the source (btrfs, XFS, bcachefs)
+    FICLONE = 0x40049409
+    # VDF text compresses well already at low presets, and those stay fast
+    LZMA_PRESET = 3
+
+    # Background worker that compresses and rotates backups
+    _queue = None
+    _worker = None
+    _lock = threading.Lock()
+    # Backup paths of queued jobs, so two saves never pick the same name
+    _reserved = set()
+    _sequence = itertools.count()
     
     @staticmethod
-    def create_rolling_backup(source_file: Path) -> str:
+    def create_rolling_backup(source_file: Path, will_replace: bool = False) -> str:
+        """
+        Keep the current state of source_file as a timestamped .bak.xz
+
+        Only a snapshot of the file is taken here (a hardlink or reflink when
+        possible), compression and rotation run on a background thread.
+        will_replace promises that the caller writes the new version to a
+        temporary file and renames it over source_file, so the old inode is
+        never modified and the snapshot can simply be a hardlink to it.
+        Returns the path the backup will have.
+        """
         if not source_file.exists():
             return ""
 
         max_backups = config.MAX_BACKUPS
         if max_backups <= 0: return ""
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"{source_file.name}.{timestamp}.bak"
-        backup_path = source_file.parent / backup_name
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        with BackupManager._lock:
+            # Each job owns its snapshot; saves within the same microsecond
+            # are told apart by the sequence number
+            sequence = next(BackupManager._sequence)
+            backup_path = source_file.parent / f"{source_file.name}.{timestamp}.bak.xz"
+            while backup_path.exists() or backup_path in BackupManager._reserved:
+                sequence = next(BackupManager._sequence)
+                backup_path = source_file.parent / f"{source_file.name}.{timestamp}_{sequence}.bak.xz"
+            BackupManager._reserved.add(backup_path)
+        snapshot_path = source_file.parent / f"{source_file.name}.{timestamp}_{sequence}.pending"
 
         try:
-            shutil.copy2(source_file, backup_path)
-            BackupManager._rotate_backups(source_file, max_backups)
-            return str(backup_path)
+            BackupManager.clone_file(source_file, snapshot_path, allow_link=will_replace)
         except Exception as e:
             # Fehler, die beim Backup passieren, loggen wir direkt
             print(f"Backup Error: {e}")
+            with BackupManager._lock:
+                BackupManager._reserved.discard(backup_path)
             return ""
+        BackupManager._submit((snapshot_path, backup_path, source_file, max_backups))
+        return str(backup_path)
+
+    @staticmethod
+    def wait():
+        """Block until all queued backups are written (called at exit)"""
+        if BackupManager._queue is not None:
+            BackupManager._queue.join()
+
+    @staticmethod
+    def _submit(job: tuple):
+        with BackupManager._lock:
+            if BackupManager._worker is None:
+                BackupManager._queue = queue.Queue()
+                BackupManager._worker = threading.Thread(target=BackupManager._run_worker,
+                                                         name="BackupWorker", daemon=True)
+                BackupManager._worker.start()
+                atexit.register(BackupManager.wait)
+        BackupManager._queue.put(job)
+
+    @staticmethod
+    def _run_worker():
+        jobs = BackupManager._queue
+        while True:
+            snapshot_path, backup_path, source_file, limit = jobs.get()
+            try:
+                BackupManager._compress(snapshot_path, backup_path)
+                BackupManager._rotate_backups(source_file, limit)
+            except Exception as e:
+                print(f"Backup Error: {e}")
+            finally:
+                try:
+                    snapshot_path.unlink()
+                except OSError:
+                    pass
+                with BackupManager._lock:
+                    BackupManager._reserved.discard(backup_path)
+                jobs.task_done()
+
+    @staticmethod
+    def _compress(source_file: Path, target_file: Path):
+        """Stream source_file through lzma; the target only appears once complete"""
+        tmp_path = target_file.with_name(target_file.name + '.tmp')
+        try:
+            with open(source_file, 'rb') as src, lzma.open(tmp_path, 'wb', preset=BackupManager.LZMA_PRESET) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            if target_file.exists():
+                raise FileExistsError(f"{target_file} already exists")
+            os.replace(tmp_path, target_file)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    @staticmethod
+    def clone_file(source_file: Path, target_file: Path, allow_link: bool = False) -> str:
+        """
+        Copy a file as cheaply as the filesystem allows
+
+        Tries a reflink clone first (copy-on-write, no data is copied), then
+        a hardlink if allow_link is set, then falls back to a full copy.
+        Returns the method used: 'reflink', 'link' or 'copy'.
+        """
+        if target_file.exists():
+            target_file.unlink()
+        if BackupManager._reflink(source_file, target_file):
+            return 'reflink'
+        if allow_link:
+            try:
+                os.link(source_file, target_file)
+                return 'link'
+            except OSError:
+                pass
+        shutil.copy2(source_file, target_file)
+        return 'copy'
+
+    @staticmethod
+    def _reflink(source_file: Path, target_file: Path) -> bool:
+        """Clone source_file via FICLONE; False where unsupported"""
+        try:
+            import fcntl
+        except ImportError:
+            return False
+        try:
+            with open(source_file, 'rb') as src, open(target_file, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), BackupManager.FICLONE, src.fileno())
+        except OSError:
+            try:
+                target_file.unlink()
+            except OSError:
+                pass
+            return False
+        shutil.copystat(source_file, target_file)
+        return True
 
     @staticmethod
     def _rotate_backups(source_file: Path, limit: int):
         directory = source_file.parent
         backups = []
-        for file in directory.glob(f"{source_file.name}.*.bak"):
-            backups.append(file)
+        # Plain .bak files are from before backups were compressed
+        for pattern in (f"{source_file.name}.*.bak", f"{source_file.name}.*.bak.xz"):
+            for file in directory.glob(pattern):
+                backups.append(file)
             
         backups.sort(key=os.path.getmtime, reverse=True)
         
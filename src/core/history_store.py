@@ -0,0 +1,157 @@
+"""
+History Store - Änderungsverlauf für Metadaten und Kategorien (SQLite)
+Speichern als: src/core/history_store.py
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class HistoryStore:
+    """
+    Every metadata and category change, with its time, in an SQLite file
+
+    A row holds one field of one app: kind is 'metadata' (field is the
+    metadata field) or 'category' (field is the category name, the values
+    are whether the app was in it). Values are stored as JSON so ints stay
+    ints. Rows are indexed by app id and time, so the state of an app at
+    any point is a couple of index lookups.
+
+    record() only queues a row; flush() writes everything queued in one
+    transaction. The database runs in WAL mode, so readers never wait for
+    a writer and a commit costs no fsync of the whole file. The queue
+    belongs to one writer: components that flush or roll back on their own
+    schedule each open their own HistoryStore on the same file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS changes (
+            id INTEGER PRIMARY KEY,
+            app_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            field TEXT NOT NULL,
+            old_value TEXT,
+            new_value TEXT,
+            time REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS changes_app_time ON changes (app_id, kind, time);
+        CREATE INDEX IF NOT EXISTS changes_time ON changes (time);
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        # Rows not written yet, as parameters of the INSERT
+        self.pending: List[tuple] = []
+        self._conn = None
+        # Saves may flush from the SaveScheduler or watcher thread
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _time(when) -> float:
+        return when.timestamp() if isinstance(when, datetime) else float(when)
+
+    def record(self, app_id: str, kind: str, field: str, old: Any, new: Any, when=None):
+        """Queue one changed field (when defaults to now)"""
+        when = datetime.now() if when is None else when
+        if isinstance(when, str):
+            when = datetime.fromisoformat(when)
+        with self._lock:
+            self.pending.append((app_id, kind, field, json.dumps(old), json.dumps(new), self._time(when)))
+
+    def mark(self) -> int:
+        """Position in the queue, for discard_since()"""
+        with self._lock:
+            return len(self.pending)
+
+    def discard_since(self, mark: int):
+        """Drop the rows queued after mark() returned mark"""
+        with self._lock:
+            del self.pending[mark:]
+
+    def flush(self):
+        """Write all queued rows in one transaction"""
+        with self._lock:
+            if not self.pending:
+                return
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    'INSERT INTO changes (app_id, kind, field, old_value, new_value, time) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', self.pending)
+            self.pending = []
+
+    def get_history(self, app_id: str, kind: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Changes of one app, newest first"""
+        query = 'SELECT kind, field, old_value, new_value, time FROM changes WHERE app_id = ?'
+        params: list = [app_id]
+        if kind is not None:
+            query += ' AND kind = ?'
+            params.append(kind)
+        query += ' ORDER BY time DESC, id DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+        return [{
+            'kind': kind, 'field': field,
+            'old': json.loads(old), 'new': json.loads(new),
+            'timestamp': datetime.fromtimestamp(time).isoformat(),
+        } for kind, field, old, new, time in rows]
+
+    def apps_changed_since(self, when, kind: Optional[str] = None) -> List[str]:
+        """App ids with changes after when"""
+        query = 'SELECT DISTINCT app_id FROM changes WHERE time > ?'
+        params: list = [self._time(when)]
+        if kind is not None:
+            query += ' AND kind = ?'
+            params.append(kind)
+        with self._lock:
+            return [row[0] for row in self._connect().execute(query, params)]
+
+    def changed_before(self, app_id: str, kind: str, when) -> bool:
+        """Whether app_id has any change of this kind at or before when"""
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT 1 FROM changes WHERE app_id = ? AND kind = ? AND time <= ? LIMIT 1',
+                (app_id, kind, self._time(when))).fetchone()
+        return row is not None
+
+    def values_at(self, app_id: str, kind: str, when) -> Dict[str, Any]:
+        """
+        The value every recorded field of app_id had at when
+
+        That is the new value of the last change up to when, or for fields
+        first changed later, the old value of their first change.
+        """
+        time = self._time(when)
+        values = {}
+        with self._lock:
+            conn = self._connect()
+            for field, old in conn.execute(
+                    'SELECT field, old_value FROM changes WHERE app_id = ? AND kind = ? AND time > ? '
+                    'ORDER BY time DESC, id DESC', (app_id, kind, time)):
+                values[field] = json.loads(old)
+            for field, new in conn.execute(
+                    'SELECT field, new_value FROM changes WHERE app_id = ? AND kind = ? AND time <= ? '
+                    'ORDER BY time, id', (app_id, kind, time)):
+                values[field] = json.loads(new)
+        return values
@@ -2,16 +2,29 @@
 LocalConfig Parser - Uses BackupManager (No Hardcoded Strings)
 Speichern als: src/core/localconfig_parser.py
 """
+import os
+import threading
 import vdf
 from pathlib import Path
+from typing import Dict, List, Set
 from src.utils.i18n import t
 from src.core.backup_manager import BackupManager
+from src.core.save_scheduler import synchronized
 
 class LocalConfigParser:
-    def __init__(self, config_path: Path):
+    def __init__(self, config_path: Path, history=None):
         self.config_path = config_path
         self.data = {}
+        # Optional HistoryStore that gets every category change
+        self.history = history
+        # category -> app ids, and per app category -> keys in its tags dict,
+        # built by load() and kept in step by the category methods
+        self._members: Dict[str, Set[str]] = {}
+        self._app_tags: Dict[str, Dict[str, List[str]]] = {}
+        # Saves may run on the SaveScheduler thread
+        self._lock = threading.RLock()
 
+    @synchronized
     def load(self) -> bool:
         if not self.config_path or not self.config_path.exists():
             print(t('logs.parser.file_not_found', path=self.config_path))
@@ -24,21 +37,35 @@ class LocalConfigParser:
             if 'UserLocalConfigStore' not in self.data:
                 pass
             
+            self._build_index()
             print(t('logs.parser.loaded', count=len(self.get_all_app_ids())))
             return True
         except Exception as e:
             print(t('logs.parser.load_error', error=e))
             return False
 
+    @synchronized
     def save(self) -> bool:
         try:
-            backup = BackupManager.create_rolling_backup(self.config_path)
+            # The new file is renamed over the old one, which therefore can
+            # be kept as backup without copying it
+            backup = BackupManager.create_rolling_backup(self.config_path, will_replace=True)
             if backup:
                 print(t('logs.parser.backup_created', path=Path(backup).name))
 
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                vdf.dump(self.data, f, pretty=True)
+            tmp_path = self.config_path.with_name(self.config_path.name + '.tmp')
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    vdf.dump(self.data, f, pretty=True)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.config_path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
             print(t('logs.parser.saved'))
+            # Single edits are queued and written together with the file
+            self._flush_history()
             return True
         except Exception as e:
             print(t('logs.parser.save_error', error=e))
@@ -54,6 +81,18 @@ class LocalConfigParser:
         apps = self.get_apps_data()
         return list(apps.keys())
 
+    def _build_index(self):
+        self._members = {}
+        self._app_tags = {}
+        for app_id, app in self.get_apps_data().items():
+            tags = app.get('tags') if isinstance(app, dict) else None
+            if not isinstance(tags, dict):
+                continue
+            app_tags = self._app_tags[app_id] = {}
+            for key, category in tags.items():
+                app_tags.setdefault(category, []).append(key)
+                self._members.setdefault(category, set()).add(app_id)
+
     def get_app_categories(self, app_id: str):
         apps = self.get_apps_data()
         if app_id in apps and 'tags' in apps[app_id]:
@@ -62,6 +101,26 @@ class LocalConfigParser:
                 return list(tags_dict.values())
         return []
 
+    def has_app_category(self, app_id: str, category: str) -> bool:
+        return category in self._app_tags.get(app_id, ())
+
+    def get_category_apps(self, category: str) -> Set[str]:
+        """App ids in category (a copy)"""
+        return set(self._members.get(category, ()))
+
+    def get_category_counts(self) -> Dict[str, int]:
+        return {category: len(apps) for category, apps in self._members.items()}
+
+    def _unlink(self, app_id: str, category: str) -> List[str]:
+        """Drop app_id from category in the index; returns its keys in the tags dict"""
+        members = self._members.get(category)
+        if members is not None:
+            members.discard(app_id)
+            if not members:
+                del self._members[category]
+        return self._app_tags.get(app_id, {}).pop(category, [])
+
+    @synchronized
     def add_app_category(self, app_id: str, category: str):
         apps = self.get_apps_data()
         if app_id not in apps:
@@ -71,33 +130,94 @@ class LocalConfigParser:
             apps[app_id]['tags'] = {}
         
         tags = apps[app_id]['tags']
-        if category not in tags.values():
-            idx = 0
+        app_tags = self._app_tags.setdefault(app_id, {})
+        if category not in app_tags:
+            # Keys are normally 0..n-1, so the first free one is usually n
+            idx = len(tags)
             while str(idx) in tags:
                 idx += 1
             tags[str(idx)] = category
+            app_tags[category] = [str(idx)]
+            self._members.setdefault(category, set()).add(app_id)
+            self._record(app_id, category, True)
 
+    @synchronized
     def remove_app_category(self, app_id: str, category: str):
         apps = self.get_apps_data()
         if app_id in apps and 'tags' in apps[app_id]:
             tags = apps[app_id]['tags']
-            keys_to_remove = [k for k, v in tags.items() if v == category]
+            keys_to_remove = self._unlink(app_id, category)
             for k in keys_to_remove:
                 del tags[k]
+            if keys_to_remove:
+                self._record(app_id, category, False)
 
+    @synchronized
     def rename_category(self, old_name: str, new_name: str):
+        if old_name == new_name:
+            return
         apps = self.get_apps_data()
-        for app_id, data in apps.items():
-            if 'tags' in data:
-                for k, v in data['tags'].items():
-                    if v == old_name:
-                        data['tags'][k] = new_name
+        for app_id in self._members.get(old_name, set()).copy():
+            tags = apps[app_id]['tags']
+            keys = self._unlink(app_id, old_name)
+            if new_name in self._app_tags[app_id]:
+                # Already in the target category: merge instead of duplicating
+                for k in keys:
+                    del tags[k]
+            else:
+                for k in keys:
+                    tags[k] = new_name
+                self._app_tags[app_id][new_name] = keys
+                self._members.setdefault(new_name, set()).add(app_id)
+                self._record(app_id, new_name, True)
+            self._record(app_id, old_name, False)
+        self._flush_history()
 
+    @synchronized
     def delete_category(self, category_name: str):
         apps = self.get_apps_data()
-        for app_id, data in apps.items():
-            if 'tags' in data:
-                tags = data['tags']
-                keys_to_delete = [k for k, v in tags.items() if v == category_name]
-                for k in keys_to_delete:
-                    del tags[k]
+        for app_id in self._members.get(category_name, set()).copy():
+            tags = apps[app_id]['tags']
+            for k in self._unlink(app_id, category_name):
+                del tags[k]
+            self._record(app_id, category_name, False)
+        self._flush_history()
+
+    def _record(self, app_id: str, category: str, member: bool):
+        if self.history is not None:
+            self.history.record(app_id, 'category', category, not member, member)
+
+    def _flush_history(self):
+        if self.history is not None:
+            try:
+                self.history.flush()
+            except Exception as e:
+                print(t('logs.parser.history_error', error=e))
+
+    @synchronized
+    def revert_categories_to(self, when, app_ids=None) -> int:
+        """
+        Give apps the categories they had at when (a datetime)
+
+        Only categories with recorded changes are touched; the revert is
+        recorded as well and can be undone the same way. Returns the number
+        of changed apps.
+        """
+        if self.history is None:
+            return 0
+        if app_ids is None:
+            app_ids = self.history.apps_changed_since(when, 'category')
+        changed = 0
+        for app_id in app_ids:
+            current = self._app_tags.get(app_id, {})
+            membership = self.history.values_at(app_id, 'category', when)
+            to_add = [cat for cat, member in membership.items() if member and cat not in current]
+            to_remove = [cat for cat, member in membership.items() if not member and cat in current]
+            for category in to_add:
+                self.add_app_category(app_id, category)
+            for category in to_remove:
+                self.remove_app_category(app_id, category)
+            if to_add or to_remove:
+                changed += 1
+        self._flush_history()
+        return changed
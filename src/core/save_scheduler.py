@@ -0,0 +1,73 @@
+"""
+Save Scheduler - Debounced Background Saves
+Speichern als: src/core/save_scheduler.py
+"""
+import functools
+import threading
+from typing import Callable, Dict, Optional
+
+
+def synchronized(method):
+    """Run a method while holding the instance's _lock (an RLock)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class SaveScheduler:
+    """
+    Coalesces save requests and runs them on a worker thread
+
+    Every schedule() call restarts the delay window, so a burst of edits
+    ends in a single save per key once the user pauses. The save functions
+    must be safe to call from another thread (LocalConfigParser and
+    AppInfoManager lock their state for that). flush() saves right away
+    on the calling thread, shutdown() does so one last time on exit.
+    """
+
+    def __init__(self, delay: float = 1.5):
+        self.delay = delay
+        self._pending: Dict[str, Callable[[], bool]] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        # Only one flush at a time, whether from the timer or a caller
+        self._flush_lock = threading.Lock()
+
+    def schedule(self, key: str, save: Callable[[], bool]):
+        """Mark key dirty; save() runs once no new request came in for delay seconds"""
+        with self._lock:
+            self._pending[key] = save
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return bool(self._pending)
+
+    def flush(self) -> bool:
+        """Run all pending saves now; True if every one of them succeeded"""
+        with self._flush_lock:
+            with self._lock:
+                pending = self._pending
+                self._pending = {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            success = True
+            for key, save in pending.items():
+                try:
+                    if not save():
+                        success = False
+                except Exception as e:
+                    print(f"Save Error ({key}): {e}")
+                    success = False
+            return success
+
+    def shutdown(self) -> bool:
+        """Flush whatever is still pending (call before the application exits)"""
+        return self.flush()
@@ -19,6 +19,8 @@ from src.config import config
 from src.core.game_manager import GameManager, Game
 from src.core.localconfig_parser import LocalConfigParser
 from src.core.appinfo_manager import AppInfoManager
+from src.core.save_scheduler import SaveScheduler
+from src.core.history_store import HistoryStore
 from src.core.steam_auth import SteamAuthManager
 from src.integrations.steam_store import SteamStoreScraper, FranchiseDetector
 from src.ui.auto_categorize_dialog import AutoCategorizeDialog
@@ -43,6 +45,8 @@ class MainWindow(QMainWindow):
         self.vdf_parser: Optional[LocalConfigParser] = None
         self.steam_scraper: Optional[SteamStoreScraper] = None
         self.appinfo_manager: Optional[AppInfoManager] = None
+        # Single edits are saved together once the user pauses
+        self.save_scheduler = SaveScheduler(config.SAVE_DELAY)
         
         self.auth_manager = SteamAuthManager()
         self.auth_manager.auth_success.connect(self._on_steam_login_success)
@@ -181,9 +185,27 @@ class MainWindow(QMainWindow):
         self.set_status(t('ui.login.status_failed'))
         QMessageBox.critical(self, t('ui.dialogs.error'), error)
 
+    def _schedule_localconfig_save(self):
+        self.save_scheduler.schedule('localconfig', self.vdf_parser.save)
+
+    def _schedule_appinfo_save(self):
+        self.save_scheduler.schedule('appinfo', self.appinfo_manager.save_appinfo)
+
+    def closeEvent(self, event):
+        self.save_scheduler.shutdown()
+        self._close_data()
+        super().closeEvent(event)
+
+    def _close_data(self):
+        if self.appinfo_manager:
+            self.appinfo_manager.close()
+        if self.vdf_parser and self.vdf_parser.history:
+            self.vdf_parser.history.close()
+
     def force_save(self):
         if self.vdf_parser:
-            if self.vdf_parser.save():
+            self._schedule_localconfig_save()
+            if self.save_scheduler.flush():
                 self.set_status(t('ui.status.saved_backup'))
             else:
                 QMessageBox.critical(self, t('ui.dialogs.error'), t('ui.errors.save_failed'))
@@ -192,6 +214,8 @@ class MainWindow(QMainWindow):
         QMessageBox.about(self, t('ui.menu.about'), t('ui.dialogs.about_text'))
 
     def _load_data(self):
+        # Pending edits belong to the parsers that are about to be replaced
+        self.save_scheduler.flush()
         self.set_status(t('ui.status.loading'))
         if not config.STEAM_PATH:
             QMessageBox.warning(self, t('ui.dialogs.error'), t('errors.steam_not_found'))
@@ -202,6 +226,8 @@ class MainWindow(QMainWindow):
             return
         self.user_label.setText(t('ui.main.user_auto', user_id=short_id))
         config_path = config.get_localconfig_path(short_id)
+        if self.vdf_parser and self.vdf_parser.history:
+            self.vdf_parser.history.close()
         self.vdf_parser = LocalConfigParser(config_path)
         if not self.vdf_parser.load():
             QMessageBox.warning(self, t('ui.dialogs.error'), t('ui.errors.localconfig_load_error'))
@@ -213,8 +239,15 @@ class MainWindow(QMainWindow):
             self.set_status(t('ui.status.api_error') + t('ui.status.offline_mode'))
         self.game_manager.merge_with_localconfig(self.vdf_parser)
         self.steam_scraper = SteamStoreScraper(config.CACHE_DIR, config.TAGS_LANGUAGE)
+        if self.appinfo_manager:
+            # The old index keeps appinfo.vdf mapped, and a file Steam has
+            # replaced on disk, until it is closed; garbage collection is too late
+            self.appinfo_manager.close()
         self.appinfo_manager = AppInfoManager(config.STEAM_PATH)
-        self.appinfo_manager.load_appinfo()
+        # Category changes go into the same history file as metadata changes,
+        # through their own queue so transactions never flush or drop them
+        self.vdf_parser.history = HistoryStore(self.appinfo_manager.history.db_path)
+        self.appinfo_manager.prefetch_metadata(self.game_manager.games.keys())
         self.game_manager.apply_metadata_overrides(self.appinfo_manager)
         self._populate_categories()
         if api_success:
@@ -265,7 +298,7 @@ class MainWindow(QMainWindow):
             if category in game.categories:
                 game.categories.remove(category)
                 self.vdf_parser.remove_app_category(app_id, category)
-        self.vdf_parser.save()
+        self._schedule_localconfig_save()
         self._populate_categories()
         all_categories = list(self.game_manager.get_all_categories().keys())
         self.details_widget.set_game(game, all_categories)
@@ -318,7 +351,7 @@ class MainWindow(QMainWindow):
         else:
             game.categories.append('favorite')
             self.vdf_parser.add_app_category(game.app_id, 'favorite')
-        self.vdf_parser.save()
+        self._schedule_localconfig_save()
         self._populate_categories()
 
     def open_in_store(self, game: Game):
@@ -329,7 +362,7 @@ class MainWindow(QMainWindow):
         new_name, ok = QInputDialog.getText(self, t('ui.game_list.context_menu.rename'), t('ui.dialogs.rename_category', old=old_name))
         if ok and new_name and new_name != old_name:
             self.vdf_parser.rename_category(old_name, new_name)
-            self.vdf_parser.save()
+            self._schedule_localconfig_save()
             self._populate_categories()
 
     def delete_category(self, category: str):
@@ -337,7 +370,7 @@ class MainWindow(QMainWindow):
                                      t('ui.dialogs.confirm_delete_category_msg'))
         if reply == QMessageBox.StandardButton.Yes:
             self.vdf_parser.delete_category(category)
-            self.vdf_parser.save()
+            self._schedule_localconfig_save()
             self._populate_categories()
 
     def auto_categorize(self):
@@ -424,7 +457,7 @@ class MainWindow(QMainWindow):
             new_meta = dialog.get_metadata()
             if new_meta:
                 self.appinfo_manager.set_app_metadata(game.app_id, new_meta)
-                self.appinfo_manager.save_appinfo()
+                self._schedule_appinfo_save()
                 if new_meta.get('name'): game.name = new_meta['name']
                 if new_meta.get('developer'): game.developer = new_meta['developer']
                 if new_meta.get('publisher'): game.publisher = new_meta['publisher']
@@ -447,31 +480,38 @@ class MainWindow(QMainWindow):
         progress = QProgressDialog(t('ui.status.applying_changes'), t('ui.dialogs.cancel'), 0, len(games), self)
         progress.setWindowModality(Qt.WindowModality.WindowModal)
         success_count = 0
-        for i, game in enumerate(games):
-            if progress.wasCanceled(): break
-            progress.setValue(i)
-            progress.setLabelText(f"{game.name[:50]}...")
-            QApplication.processEvents()
-            meta = self.appinfo_manager.get_app_metadata(game.app_id)
-            modified_meta = meta.copy()
-            if 'developer' in settings: modified_meta['developer'] = settings['developer']
-            if 'publisher' in settings: modified_meta['publisher'] = settings['publisher']
-            if 'release_date' in settings: modified_meta['release_date'] = settings['release_date']
-            if 'name_modifications' in settings:
-                name_mods = settings['name_modifications']
-                name = modified_meta.get('name', game.name)
-                if 'remove' in name_mods and name_mods['remove']: 
-                    name = name.replace(name_mods['remove'], '')
-                if 'prefix' in name_mods and name_mods['prefix']: 
-                    name = name_mods['prefix'] + name
-                if 'suffix' in name_mods and name_mods['suffix']: 
-                    name = name + name_mods['suffix']
-                modified_meta['name'] = name.strip()
-            self.appinfo_manager.set_app_metadata(game.app_id, modified_meta)
-            success_count += 1
+        # One validation and one save for the whole selection
+        try:
+            with self.appinfo_manager.transaction():
+                for i, game in enumerate(games):
+                    if progress.wasCanceled(): break
+                    progress.setValue(i)
+                    progress.setLabelText(f"{game.name[:50]}...")
+                    QApplication.processEvents()
+                    meta = self.appinfo_manager.get_app_metadata(game.app_id)
+                    modified_meta = meta.copy()
+                    if 'developer' in settings: modified_meta['developer'] = settings['developer']
+                    if 'publisher' in settings: modified_meta['publisher'] = settings['publisher']
+                    if 'release_date' in settings: modified_meta['release_date'] = settings['release_date']
+                    if 'name_modifications' in settings:
+                        name_mods = settings['name_modifications']
+                        name = modified_meta.get('name', game.name)
+                        if 'remove' in name_mods and name_mods['remove']: 
+                            name = name.replace(name_mods['remove'], '')
+                        if 'prefix' in name_mods and name_mods['prefix']: 
+                            name = name_mods['prefix'] + name
+                        if 'suffix' in name_mods and name_mods['suffix']: 
+                            name = name + name_mods['suffix']
+                        modified_meta['name'] = name.strip()
+                    self.appinfo_manager.set_app_metadata(game.app_id, modified_meta)
+                    success_count += 1
+        except Exception as e:
+            # Nothing of the selection was applied
+            progress.close()
+            QMessageBox.critical(self, t('ui.dialogs.error'), str(e))
+            return
         progress.setValue(len(games))
         if success_count > 0:
-            self.appinfo_manager.save_appinfo()
             self.game_manager.apply_metadata_overrides(self.appinfo_manager)
             self._populate_categories()
             QMessageBox.information(self, t('ui.dialogs.success'), t('ui.dialogs.bulk_success', count=success_count))
@@ -485,8 +525,9 @@ class MainWindow(QMainWindow):
         dialog = MetadataRestoreDialog(self, mod_count)
         if dialog.exec() and dialog.should_restore():
             restored = self.appinfo_manager.restore_modifications()
-            self.appinfo_manager.save_appinfo()
-            self.refresh_data()
+            if restored:
+                self.appinfo_manager.save_appinfo()
+                self.refresh_data()
             QMessageBox.information(self, t('ui.dialogs.success'), t('ui.dialogs.restore_success', count=restored))
 
     def refresh_data(self):
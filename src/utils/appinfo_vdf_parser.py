@@ -1,11 +1,67 @@
 """
-AppInfo VDF Parser - Binary VDF Reader
+AppInfo VDF Parser - Binary VDF Reader/Writer
 Speichern als: src/utils/appinfo_vdf_parser.py
 """
 
+import gc
+import hashlib
+import mmap
+import os
 import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, Any, BinaryIO
+from collections import namedtuple
+from typing import Dict, Any, BinaryIO, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Node of a compiled key-path projection, see AppInfoParser.compile_paths()
+ProjectionNode = namedtuple('ProjectionNode', ['children', 'key_lengths'])
+
+# Serialized form of one app kept between saves, see AppInfoParser.dump().
+# source is the dict it was made from, keys the (key, index) pairs a v29
+# record refers to in first-use order (None for inline keys).
+CachedRecord = namedtuple('CachedRecord', ['source', 'text_sha1', 'binary_sha1', 'data', 'keys'])
+
+
+
+class AppInfoHeader:
+    """
+    Header fields of one app record (binary_sha1 is None before v28)
+
+    Kept next to the decoded data so a writer can give unmodified apps back
+    their original state, token, change number and hashes. __slots__ keeps
+    this at a fraction of a dict per app for files with 150k records.
+    """
+
+    __slots__ = ('size', 'info_state', 'last_updated', 'token', 'sha1', 'change_number', 'binary_sha1')
+
+    def __init__(self, size: int, info_state: int, last_updated: int, token: int, sha1: bytes,
+                 change_number: int, binary_sha1: Optional[bytes] = None):
+        self.size = size
+        self.info_state = info_state
+        self.last_updated = last_updated
+        self.token = token
+        self.sha1 = sha1
+        self.change_number = change_number
+        self.binary_sha1 = binary_sha1
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, AppInfoHeader):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'AppInfoHeader({fields})'
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
 
 class AppInfoParser:
     """Parser für Steam's appinfo.vdf (Binary VDF Format)"""
@@ -24,21 +80,634 @@ class AppInfoParser:
     MAGIC_V29 = 0x07564429
     SUPPORTED_VERSIONS = [MAGIC_V27, MAGIC_V28, MAGIC_V29]
 
+    UNIVERSE = 1
+
+    # Precompiled structs for the mmap reader
+    _FILE_HEADER = struct.Struct('<II')          # magic, universe
+    _STRING_TABLE_OFFSET = struct.Struct('<q')   # v29: follows the file header
+    _RECORD_HEADER = struct.Struct('<IIIIQ20sI')  # app_id ... change_number
+    _UINT32 = struct.Struct('<I')
+    _INT32 = struct.Struct('<i')
+    _UINT64 = struct.Struct('<Q')
+    _INT64 = struct.Struct('<q')
+    # size, info_state, last_updated, token, sha1, change_number
+    _ENTRY_HEADER = struct.Struct('<IIIQ20sI')
+
+    # The writer hands its buffer to the file once it grows past this
+    WRITE_CHUNK_SIZE = 4 * 1024 * 1024
+
+    # app_id + size + info_state, last_updated, token, sha1, change_number
+    RECORD_HEADER_SIZE = 8 + 40
+    BINARY_HASH_SIZE = 20
+
+    # Subtree diff_common() and AppInfoIndex.diff() compare
+    COMMON_PATH = ('appinfo', 'common')
+
     @staticmethod
-    def load(file_path: Path) -> Dict[str, Any]:
-        """Load appinfo.vdf file"""
+    def load(file_path: Path, use_mmap: bool = True, paths: Iterable = None,
+             workers: int = 1, headers: Optional[Dict[str, AppInfoHeader]] = None) -> Dict[str, Any]:
+        """
+        Load appinfo.vdf file
+
+        By default the file is memory-mapped and walked in place; use_mmap=False
+        selects the old stream reader, which is kept for comparison. With paths
+        only the selected keys of each app are decoded (see compile_paths).
+        workers > 1 decodes the records in that many processes. A headers dict
+        is filled with the AppInfoHeader of every record (see dump).
+        """
+        if workers > 1:
+            if not use_mmap:
+                raise ValueError("workers requires the mmap reader")
+            if headers is not None:
+                headers.update(AppInfoParser.load_headers(file_path))
+            return AppInfoParser._load_parallel(file_path, paths, workers)
+
+        with open(file_path, 'rb') as f:
+            if not use_mmap:
+                if paths is not None:
+                    raise ValueError("paths requires the mmap reader")
+                return AppInfoParser._parse_file(f, headers)
+
+            # The cyclic GC would repeatedly rescan the growing tree of
+            # freshly allocated dicts, none of which can be garbage yet
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return AppInfoParser._parse_buffer(mm, paths, headers)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+
+    @staticmethod
+    def iter_apps(file_path: Path, app_ids: Iterable[str] = None) -> Iterator[Tuple[str, AppInfoHeader, Dict[str, Any]]]:
+        """
+        Yield (app_id, header, data) one record at a time
+
+        Nothing is kept between records, so memory stays flat regardless of
+        file size. With app_ids only those records are decoded; the others
+        are skipped using their size field.
+        """
+        wanted = None if app_ids is None else {str(app_id) for app_id in app_ids}
+        unpack_uint32 = AppInfoParser._UINT32.unpack_from
+        read_header = AppInfoParser._read_header
+
         with open(file_path, 'rb') as f:
-            return AppInfoParser._parse_file(f)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                magic = AppInfoParser._read_magic(mm)
+                header_size = AppInfoParser._record_header_size(magic)
+                has_binary_hash = magic >= AppInfoParser.MAGIC_V28
+                string_table = AppInfoParser._read_string_table(mm, magic)
+                read_object = AppInfoParser._make_object_reader(mm, view, string_table)
+
+                pos = AppInfoParser._records_start(magic)
+                while True:
+                    try:
+                        app_id = unpack_uint32(view, pos)[0]
+                        if app_id == 0:
+                            break
+                        size = unpack_uint32(view, pos + 4)[0]
+                    except struct.error as e:
+                        raise ValueError(f"Unexpected EOF at offset {pos}") from e
+
+                    key = str(app_id)
+                    if wanted is None or key in wanted:
+                        try:
+                            header = read_header(mm, pos, has_binary_hash)
+                            data, _ = read_object(pos + header_size)
+                        except (IndexError, struct.error) as e:
+                            raise ValueError(f"Unexpected EOF in app {key}") from e
+                        yield key, header, data
+                        if wanted is not None:
+                            wanted.discard(key)
+                            if not wanted:
+                                break
+                    pos += 8 + size
+
+    @staticmethod
+    def _load_parallel(file_path: Path, paths: Optional[Iterable], workers: int) -> Dict[str, Any]:
+        """
+        Decode the records in a process pool
+
+        The parent only scans the record headers; each worker maps the same
+        file read-only and decodes a contiguous chunk of records. Several
+        chunks per worker keep the pool busy when app sizes are uneven.
+        """
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic = AppInfoParser._read_magic(mm)
+                offsets, _ = AppInfoParser._scan_records(mm, magic)
+
+        records = [(app_id, offset) for app_id, (offset, _) in offsets.items()]
+        chunk_size = max(1, -(-len(records) // (workers * 4)))
+        chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+        if paths is not None:
+            paths = list(paths)
+
+        apps = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields in submission order, so the record order is kept
+            for part in pool.map(AppInfoParser._decode_records, repeat(str(file_path)), chunks, repeat(paths)):
+                apps.update(part)
+        return apps
+
+    @staticmethod
+    def _decode_records(file_path: str, records: List[Tuple[str, int]],
+                        paths: Optional[List] = None) -> Dict[str, Any]:
+        """Worker: decode the given (app_id, offset) records of a file"""
+        gc.disable()
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                magic = AppInfoParser._read_magic(mm)
+                header_size = AppInfoParser._record_header_size(magic)
+                string_table = AppInfoParser._read_string_table(mm, magic)
+                if paths is None:
+                    read_object = AppInfoParser._make_object_reader(mm, view, string_table)
+                else:
+                    read_projection = AppInfoParser._make_projection_reader(mm, view, string_table)
+                    projection = AppInfoParser.compile_paths(paths)
+
+                    def read_object(pos):
+                        return read_projection(pos, projection)
+
+                apps = {}
+                for app_id, offset in records:
+                    try:
+                        apps[app_id], _ = read_object(offset + header_size)
+                    except (IndexError, struct.error) as e:
+                        raise ValueError(f"Unexpected EOF in app {app_id}") from e
+                return apps
+
+    @staticmethod
+    def verify(file_path: Path, workers: int = None) -> List[str]:
+        """
+        Check every record's stored binary SHA1 against its data (v28+)
+
+        Returns the app ids whose data does not match, e.g. after Steam was
+        interrupted while writing. Older versions have no binary hash and
+        always pass.
+        """
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                magic = AppInfoParser._read_magic(mm)
+                offsets, _ = AppInfoParser._scan_records(mm, magic)
+                return AppInfoParser._verify_records(mm, view, magic, offsets, workers)
+
+    @staticmethod
+    def _verify_records(mm, view: memoryview, magic: int, offsets: Dict[str, Tuple[int, int]],
+                        workers: int = None) -> List[str]:
+        """
+        Hash the records in a thread pool
+
+        hashlib releases the GIL while hashing, so threads scale across cores
+        without copying anything out of the mapping. Each thread takes a
+        contiguous slice of records to keep the per-task overhead small.
+        """
+        if magic < AppInfoParser.MAGIC_V28:
+            return []
+        hash_start = AppInfoParser.RECORD_HEADER_SIZE
+        data_start = hash_start + AppInfoParser.BINARY_HASH_SIZE
+        sha1 = hashlib.sha1
+
+        def check(records: List[Tuple[str, Tuple[int, int]]]) -> List[str]:
+            corrupt = []
+            for app_id, (offset, size) in records:
+                end = offset + 8 + size
+                if sha1(view[offset + data_start:end]).digest() != mm[offset + hash_start:offset + data_start]:
+                    corrupt.append(app_id)
+            return corrupt
+
+        records = list(offsets.items())
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, -(-len(records) // (workers * 4)))
+        chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+        if workers == 1:
+            return [app_id for chunk in chunks for app_id in check(chunk)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return [app_id for corrupt in pool.map(check, chunks) for app_id in corrupt]
+
+    @staticmethod
+    def read_version(file_path: Path) -> Optional[int]:
+        """Return the magic of an existing appinfo.vdf (None if unreadable)"""
+        try:
+            with open(file_path, 'rb') as f:
+                magic = struct.unpack('<I', f.read(4))[0]
+        except (OSError, struct.error):
+            return None
+        return magic if magic in AppInfoParser.SUPPORTED_VERSIONS else None
+
+    @staticmethod
+    def load_headers(file_path: Path) -> Dict[str, AppInfoHeader]:
+        """Read only the record headers, without decoding any VDF data"""
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic = AppInfoParser._read_magic(mm)
+                offsets, _ = AppInfoParser._scan_records(mm, magic)
+                has_binary_hash = magic >= AppInfoParser.MAGIC_V28
+                return {app_id: AppInfoParser._read_header(mm, offset, has_binary_hash)
+                        for app_id, (offset, _) in offsets.items()}
+
+    # ------------------------------------------------------------------
+    # mmap reader
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compile_paths(paths: Iterable) -> ProjectionNode:
+        """
+        Build a projection tree from key paths
+
+        A path is a tuple of keys or a dotted string, e.g.
+        ('appinfo', 'common', 'name') or 'appinfo.common.name'. The last key of
+        a path selects its whole value, including nested objects. Children of
+        a node are keyed by the UTF-8 encoded key, None marks a selected leaf.
+        """
+        root: Dict[bytes, Any] = {}
+        for path in paths:
+            keys = path.split('.') if isinstance(path, str) else list(path)
+            if not keys:
+                continue
+            node = root
+            for key in keys[:-1]:
+                key = key.encode('utf-8')
+                if key in node and node[key] is None:
+                    break  # An ancestor is already selected as a whole
+                node = node.setdefault(key, {})
+            else:
+                node[keys[-1].encode('utf-8')] = None
+
+        def freeze(node: Dict[bytes, Any]):
+            children = {k: (None if v is None else freeze(v)) for k, v in node.items()}
+            return ProjectionNode(children, frozenset(len(k) for k in children))
+
+        return freeze(root)
+
+    @staticmethod
+    def _parse_buffer(mm, paths: Iterable = None,
+                      headers: Optional[Dict[str, AppInfoHeader]] = None) -> Dict[str, Any]:
+        """Parse entire appinfo file from a memory-mapped buffer"""
+        magic = AppInfoParser._read_magic(mm)
+        header_size = AppInfoParser._record_header_size(magic)
+        has_binary_hash = magic >= AppInfoParser.MAGIC_V28
+        read_header = AppInfoParser._read_header
+        string_table = AppInfoParser._read_string_table(mm, magic)
+        unpack_uint32 = AppInfoParser._UINT32.unpack_from
+
+        apps = {}
+        with memoryview(mm) as view:
+            if paths is None:
+                read_object = AppInfoParser._make_object_reader(mm, view, string_table)
+            else:
+                read_projection = AppInfoParser._make_projection_reader(mm, view, string_table)
+                projection = AppInfoParser.compile_paths(paths)
+
+                def read_object(pos):
+                    return read_projection(pos, projection)
+
+            pos = AppInfoParser._records_start(magic)
+            try:
+                while True:
+                    app_id = unpack_uint32(view, pos)[0]
+                    if app_id == 0:
+                        break
+
+                    # Size counts everything after the size field itself
+                    size = unpack_uint32(view, pos + 4)[0]
+                    app_data, _ = read_object(pos + header_size)
+                    apps[str(app_id)] = app_data
+                    if headers is not None:
+                        headers[str(app_id)] = read_header(mm, pos, has_binary_hash)
+                    pos += 8 + size
+            except (IndexError, struct.error) as e:
+                raise ValueError(f"Unexpected EOF at offset {pos}") from e
+
+        return apps
+
+    @staticmethod
+    def _read_magic(mm) -> int:
+        """Read and validate the file magic"""
+        magic, _ = AppInfoParser._FILE_HEADER.unpack_from(mm, 0)
+        if magic not in AppInfoParser.SUPPORTED_VERSIONS:
+            raise ValueError(f"Unsupported AppInfo version: {hex(magic)}")
+        return magic
+
+    @staticmethod
+    def _records_start(magic: int) -> int:
+        """Offset of the first record"""
+        if magic >= AppInfoParser.MAGIC_V29:
+            return AppInfoParser._FILE_HEADER.size + AppInfoParser._STRING_TABLE_OFFSET.size
+        return AppInfoParser._FILE_HEADER.size
+
+    @staticmethod
+    def _read_string_table(mm, magic: int) -> Optional[List[str]]:
+        """
+        Read the v29 key string table (None for older versions)
+
+        v29 stores every key once in a table after the last record and refers
+        to it by uint32 index. The keys are interned, so all decoded apps share
+        one str object per distinct key.
+        """
+        if magic < AppInfoParser.MAGIC_V29:
+            return None
+        offset = AppInfoParser._STRING_TABLE_OFFSET.unpack_from(mm, AppInfoParser._FILE_HEADER.size)[0]
+        try:
+            count = AppInfoParser._UINT32.unpack_from(mm, offset)[0]
+        except struct.error as e:
+            raise ValueError(f"Invalid string table offset {offset}") from e
+
+        find = mm.find
+        pos = offset + 4
+        keys = []
+        for _ in range(count):
+            end = find(b'\x00', pos)
+            if end < 0:
+                raise ValueError("Unexpected EOF in string table")
+            keys.append(sys.intern(mm[pos:end].decode('utf-8', 'replace')))
+            pos = end + 1
+        return keys
+
+    @staticmethod
+    def _record_header_size(magic: int) -> int:
+        """Bytes from the start of a record to its VDF data"""
+        if magic >= AppInfoParser.MAGIC_V28:
+            return AppInfoParser.RECORD_HEADER_SIZE + AppInfoParser.BINARY_HASH_SIZE
+        return AppInfoParser.RECORD_HEADER_SIZE
+
+    @staticmethod
+    def _read_header(mm, pos: int, has_binary_hash: bool) -> AppInfoHeader:
+        """Decode the header of the record starting at pos"""
+        _, size, info_state, last_updated, token, sha1, change_number = \
+            AppInfoParser._RECORD_HEADER.unpack_from(mm, pos)
+        binary_sha1 = None
+        if has_binary_hash:
+            start = pos + AppInfoParser.RECORD_HEADER_SIZE
+            binary_sha1 = mm[start:start + AppInfoParser.BINARY_HASH_SIZE]
+        return AppInfoHeader(size, info_state, last_updated, token, sha1, change_number, binary_sha1)
+
+    @staticmethod
+    def decode_record(record: bytes, magic: int,
+                      strings: Optional[Dict[int, str]] = None) -> Tuple[str, AppInfoHeader, Dict[str, Any]]:
+        """
+        Decode one raw record (see AppInfoIndex.get_record) on its own
+
+        magic is the version of the file the record came from, strings (v29)
+        the string table entries it refers to (AppInfoIndex.record_strings).
+        """
+        string_table = None
+        if magic >= AppInfoParser.MAGIC_V29:
+            strings = strings or {}
+            string_table = [''] * (max(strings) + 1 if strings else 0)
+            for index, key in strings.items():
+                string_table[index] = sys.intern(key)
+        app_id = AppInfoParser._UINT32.unpack_from(record, 0)[0]
+        header = AppInfoParser._read_header(record, 0, magic >= AppInfoParser.MAGIC_V28)
+        with memoryview(record) as view:
+            read_object = AppInfoParser._make_object_reader(record, view, string_table)
+            try:
+                data, _ = read_object(AppInfoParser._record_header_size(magic))
+            except (IndexError, struct.error) as e:
+                raise ValueError(f"Unexpected EOF in app {app_id}") from e
+        return str(app_id), header, data
+
+    @staticmethod
+    def _scan_records(mm, magic: int) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, Tuple[int, bytes]]]:
+        """
+        Skip-scan the record headers without decoding any VDF data
+
+        Returns ({app_id: (offset, size)}, {app_id: (change_number, sha1)}),
+        where offset is the start of the record, size the value of its size
+        field and sha1 the stored hash of the app's text VDF.
+        """
+        unpack_uint32 = AppInfoParser._UINT32.unpack_from
+        offsets = {}
+        fingerprints = {}
+        pos = AppInfoParser._records_start(magic)
+        try:
+            while True:
+                app_id = unpack_uint32(mm, pos)[0]
+                if app_id == 0:
+                    break
+                size = unpack_uint32(mm, pos + 4)[0]
+                key = str(app_id)
+                offsets[key] = (pos, size)
+                # info_state, last_updated, token precede sha1 and change_number
+                fingerprints[key] = (unpack_uint32(mm, pos + 44)[0], mm[pos + 24:pos + 44])
+                pos += 8 + size
+        except struct.error as e:
+            raise ValueError(f"Unexpected EOF at offset {pos}") from e
+        return offsets, fingerprints
+
+    @staticmethod
+    def _make_object_reader(mm, view: memoryview, string_table: Optional[List[str]] = None):
+        """
+        Build a read_object(pos) -> (dict, end_pos) function for one buffer
+
+        Type bytes and fixed-width fields are read from the memoryview with
+        precompiled structs, string ends are found with mm.find(). Everything
+        is bound to closure locals because attribute lookups per field cost
+        more than the decoding itself in pure Python.
+
+        Keys are resolved through string_table (v29) or decoded inline and
+        interned through a per-buffer cache, so repeated keys share one str.
+        """
+        find = mm.find
+        key_cache: Dict[bytes, str] = {}
+        unpack_uint32 = AppInfoParser._UINT32.unpack_from
+        unpack_int32 = AppInfoParser._INT32.unpack_from
+        unpack_uint64 = AppInfoParser._UINT64.unpack_from
+        unpack_int64 = AppInfoParser._INT64.unpack_from
+
+        def read_object(pos: int) -> Tuple[Dict[str, Any], int]:
+            data = {}
+            while True:
+                type_id = view[pos]
+                pos += 1
+                if type_id == 0x08:  # TYPE_END
+                    break
+
+                if string_table is not None:
+                    key = string_table[unpack_uint32(view, pos)[0]]
+                    pos += 4
+                else:
+                    end = find(b'\x00', pos)
+                    if end < 0:
+                        raise ValueError("Unexpected EOF reading key")
+                    raw_key = mm[pos:end]
+                    key = key_cache.get(raw_key)
+                    if key is None:
+                        key = key_cache[raw_key] = sys.intern(raw_key.decode('utf-8', 'replace'))
+                    pos = end + 1
+
+                if type_id == 0x00:  # TYPE_NONE
+                    value, pos = read_object(pos)
+                elif type_id == 0x01:  # TYPE_STRING
+                    end = find(b'\x00', pos)
+                    if end < 0:
+                        raise ValueError("Unexpected EOF reading string")
+                    value = mm[pos:end].decode('utf-8', 'replace')
+                    pos = end + 1
+                elif type_id == 0x02:  # TYPE_INT32
+                    value = unpack_int32(view, pos)[0]
+                    pos += 4
+                elif type_id == 0x06:  # TYPE_UINT64
+                    value = unpack_uint64(view, pos)[0]
+                    pos += 8
+                elif type_id == 0x0A:  # TYPE_INT64
+                    value = unpack_int64(view, pos)[0]
+                    pos += 8
+                else:
+                    raise ValueError(f"Unknown type: {hex(type_id)}")
+
+                data[key] = value
+            return data, pos
+
+        return read_object
+
+    @staticmethod
+    def _make_skipper(mm, view: memoryview, string_table: Optional[List[str]] = None):
+        """
+        Build a skip_value(type_id, pos) -> end_pos function for one buffer
+
+        Walks over a value (and any nested objects) without creating keys,
+        values or dicts; only string ends have to be searched.
+        """
+        find = mm.find
+        inline_keys = string_table is None
+
+        def skip_value(type_id: int, pos: int) -> int:
+            if type_id == 0x00:  # TYPE_NONE
+                while True:
+                    inner_type = view[pos]
+                    pos += 1
+                    if inner_type == 0x08:  # TYPE_END
+                        return pos
+                    if inline_keys:
+                        end = find(b'\x00', pos)
+                        if end < 0:
+                            raise ValueError("Unexpected EOF reading key")
+                        pos = skip_value(inner_type, end + 1)
+                    else:
+                        pos = skip_value(inner_type, pos + 4)
+            elif type_id == 0x01:  # TYPE_STRING
+                end = find(b'\x00', pos)
+                if end < 0:
+                    raise ValueError("Unexpected EOF reading string")
+                return end + 1
+            elif type_id == 0x02:  # TYPE_INT32
+                return pos + 4
+            elif type_id == 0x06 or type_id == 0x0A:  # TYPE_UINT64 / TYPE_INT64
+                return pos + 8
+            raise ValueError(f"Unknown type: {hex(type_id)}")
+
+        return skip_value
+
+    @staticmethod
+    def _make_projection_reader(mm, view: memoryview, string_table: Optional[List[str]] = None):
+        """
+        Build a read_projection(pos, node) -> (dict, end_pos) function
+
+        Only keys present in the projection node (see compile_paths) are
+        decoded; every other value is skipped in place. Inline keys are
+        compared as raw bytes, and only when their length matches a selected
+        key; v29 key indices are looked up in the encoded string table.
+        """
+        find = mm.find
+        read_object = AppInfoParser._make_object_reader(mm, view, string_table)
+        skip_value = AppInfoParser._make_skipper(mm, view, string_table)
+        raw_table = None
+        if string_table is not None:
+            raw_table = [key.encode('utf-8') for key in string_table]
+        unpack_uint32 = AppInfoParser._UINT32.unpack_from
+        unpack_int32 = AppInfoParser._INT32.unpack_from
+        unpack_uint64 = AppInfoParser._UINT64.unpack_from
+        unpack_int64 = AppInfoParser._INT64.unpack_from
+
+        def read_projection(pos: int, node: ProjectionNode) -> Tuple[Dict[str, Any], int]:
+            children, key_lengths = node
+            data = {}
+            while True:
+                type_id = view[pos]
+                pos += 1
+                if type_id == 0x08:  # TYPE_END
+                    break
+
+                if raw_table is not None:
+                    key_index = unpack_uint32(view, pos)[0]
+                    pos += 4
+                    raw_key = raw_table[key_index]
+                    if raw_key not in children:
+                        pos = skip_value(type_id, pos)
+                        continue
+                    key = string_table[key_index]
+                else:
+                    end = find(b'\x00', pos)
+                    if end < 0:
+                        raise ValueError("Unexpected EOF reading key")
+                    if end - pos not in key_lengths:
+                        pos = skip_value(type_id, end + 1)
+                        continue
+                    raw_key = mm[pos:end]
+                    if raw_key not in children:
+                        pos = skip_value(type_id, end + 1)
+                        continue
+                    key = sys.intern(raw_key.decode('utf-8', 'replace'))
+                    pos = end + 1
+                child = children[raw_key]
+
+                if type_id == 0x00:  # TYPE_NONE
+                    if child is None:
+                        value, pos = read_object(pos)
+                    else:
+                        value, pos = read_projection(pos, child)
+                elif child is not None:
+                    # Path continues below a scalar, nothing to select
+                    pos = skip_value(type_id, pos)
+                    continue
+                elif type_id == 0x01:  # TYPE_STRING
+                    end = find(b'\x00', pos)
+                    if end < 0:
+                        raise ValueError("Unexpected EOF reading string")
+                    value = mm[pos:end].decode('utf-8', 'replace')
+                    pos = end + 1
+                elif type_id == 0x02:  # TYPE_INT32
+                    value = unpack_int32(view, pos)[0]
+                    pos += 4
+                elif type_id == 0x06:  # TYPE_UINT64
+                    value = unpack_uint64(view, pos)[0]
+                    pos += 8
+                elif type_id == 0x0A:  # TYPE_INT64
+                    value = unpack_int64(view, pos)[0]
+                    pos += 8
+                else:
+                    raise ValueError(f"Unknown type: {hex(type_id)}")
+
+                data[key] = value
+            return data, pos
+
+        return read_projection
+
+    # ------------------------------------------------------------------
+    # Stream reader (legacy, byte-by-byte)
+    # ------------------------------------------------------------------
 
     @staticmethod
-    def _parse_file(f: BinaryIO) -> Dict[str, Any]:
+    def _parse_file(f: BinaryIO, headers: Optional[Dict[str, AppInfoHeader]] = None) -> Dict[str, Any]:
         """Parse entire appinfo file"""
         magic = struct.unpack('<I', f.read(4))[0]
         if magic not in AppInfoParser.SUPPORTED_VERSIONS:
             raise ValueError(f"Unsupported AppInfo version: {hex(magic)}")
 
         # Skip header (universe version)
-        f.read(4) 
+        f.read(4)
+
+        # V29: Keys live in a string table at the end of the file
+        string_table = None
+        if magic >= AppInfoParser.MAGIC_V29:
+            table_offset = struct.unpack('<q', f.read(8))[0]
+            records_start = f.tell()
+            f.seek(table_offset)
+            count = struct.unpack('<I', f.read(4))[0]
+            string_table = [AppInfoParser._read_cstring(f) for _ in range(count)]
+            f.seek(records_start)
 
         apps = {}
         while True:
@@ -47,129 +716,65 @@ class AppInfoParser:
                 break
 
             # Size
-            _ = struct.unpack('<I', f.read(4))[0]
-            
+            size = struct.unpack('<I', f.read(4))[0]
+            record_end = f.tell() + size
+
             # Info state
-            _ = struct.unpack('<I', f.read(4))[0]
-            
+            info_state = struct.unpack('<I', f.read(4))[0]
+
             # Last updated
-            _ = struct.unpack('<I', f.read(4))[0]
-            
+            last_updated = struct.unpack('<I', f.read(4))[0]
+
             # Token
-            _ = struct.unpack('<Q', f.read(8))[0]
-            
-            # SHA1
-            f.read(20)
-            
+            token = struct.unpack('<Q', f.read(8))[0]
+
+            # SHA1 (text VDF)
+            sha1 = f.read(20)
+
             # Change number
-            _ = struct.unpack('<I', f.read(4))[0]
+            change_number = struct.unpack('<I', f.read(4))[0]
+
+            # V28/29: SHA1 of the binary VDF data
+            binary_sha1 = None
+            if magic >= AppInfoParser.MAGIC_V28:
+                binary_sha1 = f.read(20)
 
             # Binary VDF Data
-            app_data = AppInfoParser._read_binary_vdf(f)
+            app_data = AppInfoParser._read_binary_vdf(f, string_table)
             apps[str(app_id)] = app_data
+            if headers is not None:
+                headers[str(app_id)] = AppInfoHeader(size, info_state, last_updated, token, sha1,
+                                                     change_number, binary_sha1)
+            f.seek(record_end)
 
         return apps
 
     @staticmethod
-    def _read_binary_vdf(f: BinaryIO) -> Dict[str, Any]:
+    def _read_binary_vdf(f: BinaryIO, string_table: Optional[List[str]] = None) -> Dict[str, Any]:
         """Read a single VDF object"""
         data = {}
         while True:
-            type_byte = f.read(1)
-            if not type_byte or type_byte == b'\x08': # End struct
+            type_data = f.read(1)
+            if not type_data:
                 break
-            
-            type_id = ord(type_byte)
-            key = AppInfoParser._read_string(f)
-            
-            if type_id == AppInfoParser.TYPE_NONE:
-                data[key] = AppInfoParser._read_binary_vdf(f)
-            elif type_id == AppInfoParser.TYPE_STRING:
-                data[key] = AppInfoParser._read_string(f)
-            elif type_id == AppInfoParser.TYPE_INT32:
-                data[key] = struct.unpack('<i', f.read(4))[0]
-            elif type_id == AppInfoParser.TYPE_UINT64:
-                data[key] = struct.unpack('<Q', f.read(8))[0]
-            elif type_id == AppInfoParser.TYPE_INT64:
-                data[key] = struct.unpack('<q', f.read(8))[0]
-            
-        return data
-
-    @staticmethod
-    def _read_string(f: BinaryIO) -> str:
-        """Read null-terminated string"""
-        chars = []
-        while True:
-            c = f.read(1)
-            if c == b'\x00':
-                break
-            chars.append(c)
-        return b"".join(chars).decode('utf-8', errors='replace')
-
-    @staticmethod
-    def dump(data: Dict, file_path: Path) -> bool:
-        """Dump not supported for binary format yet"""
-        # Writing binary VDF with correct checksums is complex
-        # We only support reading for metadata extraction
-        return False
-            return section_data
-
-        except Exception as e:
-            # Skip to next entry using size
-            try:
-                current_pos = f.tell()
-                bytes_read = current_pos - start_pos - 4
-
-                if 'size' in locals() and size > bytes_read:
-                    skip_bytes = size - bytes_read
-                    f.read(skip_bytes)
-            except:
-                pass
-
-            return None
-
-    @staticmethod
-    def _parse_section(f: BinaryIO) -> Dict:
-        """Parse VDF section"""
-        result = {}
-
-        type_byte = f.read(1)[0]
-        if type_byte != AppInfoParser.TYPE_NONE:
-            return result
-
-        section_name = AppInfoParser._read_cstring(f)
 
-        while True:
-            type_byte_data = f.read(1)
-            if not type_byte_data:
-                break
-
-            type_byte = type_byte_data[0]
+            type_byte = type_data[0]
             if type_byte == AppInfoParser.TYPE_END:
                 break
 
-            key = AppInfoParser._read_cstring(f)
-            value = AppInfoParser._read_value(f, type_byte)
-            result[key] = value
+            if string_table is not None:
+                key = string_table[struct.unpack('<I', f.read(4))[0]]
+            else:
+                key = AppInfoParser._read_cstring(f)
+            data[key] = AppInfoParser._read_value(f, type_byte, string_table)
 
-        return {section_name: result} if section_name else result
+        return data
 
     @staticmethod
-    def _read_value(f: BinaryIO, type_byte: int) -> Any:
+    def _read_value(f: BinaryIO, type_byte: int, string_table: Optional[List[str]] = None) -> Any:
         """Read value by type"""
         if type_byte == AppInfoParser.TYPE_NONE:
-            dict_data = {}
-            while True:
-                inner_type_data = f.read(1)
-                if not inner_type_data:
-                    break
-                inner_type = inner_type_data[0]
-                if inner_type == AppInfoParser.TYPE_END:
-                    break
-                key = AppInfoParser._read_cstring(f)
-                value = AppInfoParser._read_value(f, inner_type)
-                dict_data[key] = value
-            return dict_data
+            return AppInfoParser._read_binary_vdf(f, string_table)
 
         elif type_byte == AppInfoParser.TYPE_STRING:
             return AppInfoParser._read_cstring(f)
@@ -204,118 +809,384 @@ class AppInfoParser:
             if not c or c == b'\x00':
                 break
             chars.append(c)
-        try:
-            return b''.join(chars).decode('utf-8', errors='replace')
-        except:
-            return ''
+        return b''.join(chars).decode('utf-8', errors='replace')
+
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
 
     @staticmethod
-    def dump(data: Dict, file_path: Path, version: int = None) -> bool:
-        """Save appinfo.vdf"""
+    def dump(data: Dict, file_path: Path, version: int = None,
+             headers: Optional[Dict[str, AppInfoHeader]] = None, unchanged: Iterable[str] = None,
+             record_cache: Optional[Dict[str, CachedRecord]] = None) -> bool:
+        """
+        Save appinfo.vdf
+
+        headers (from load(headers=...) or AppInfoIndex.get_header) keeps the
+        info state, last update, token and change number of each app instead
+        of writing zeros. Apps listed in unchanged still hold the data their
+        header was read with, so its text SHA1 is reused rather than rebuilt
+        from a text VDF rendering. The binary SHA1 is always taken over the
+        bytes actually written, since the key and integer encoding may differ
+        from what Steam wrote.
+
+        record_cache keeps the serialized bytes and both hashes of every app
+        written, and later saves reuse them for the same, unmutated app dict.
+        Whoever mutates an app has to drop its entry (AppInfoManager does).
+
+        The file is written next to file_path and renamed over it, so a
+        crash never leaves a half-written appinfo.vdf and the old inode stays
+        intact (backups may hardlink it).
+        """
         if version is None:
             version = AppInfoParser.MAGIC_V29
 
+        file_path = Path(file_path)
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
         try:
-            with open(file_path, 'wb') as f:
-                AppInfoParser._write_file(f, data, version)
+            with open(tmp_path, 'wb') as f:
+                AppInfoParser._write_file(f, data, version, headers or {}, set(unchanged or ()), record_cache)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
             return True
         except Exception as e:
             print(f"Error saving appinfo.vdf: {e}")
             import traceback
             traceback.print_exc()
+            if tmp_path.exists():
+                tmp_path.unlink()
             return False
 
     @staticmethod
-    def _write_file(f: BinaryIO, apps: Dict, version: int):
+    def _write_file(f: BinaryIO, apps: Dict, version: int,
+                    headers: Optional[Dict[str, AppInfoHeader]] = None, unchanged: Set[str] = frozenset(),
+                    record_cache: Optional[Dict[str, CachedRecord]] = None):
         """Write appinfo file"""
-        f.write(struct.pack('<I', version))
-        f.write(struct.pack('<I', AppInfoParser.UNIVERSE))
+        buf = bytearray(AppInfoParser._FILE_HEADER.pack(version, AppInfoParser.UNIVERSE))
 
-        for app_id_str, app_data in apps.items():
-            app_id = int(app_id_str)
-            f.write(struct.pack('<I', app_id))
-            AppInfoParser._write_app_entry(f, app_data, version)
+        # V29: Placeholder for the string table offset, keys are collected
+        # while the apps are written
+        key_table = None
+        if version >= AppInfoParser.MAGIC_V29:
+            key_table = {}
+            table_offset_pos = len(buf)
+            buf += bytes(AppInfoParser._STRING_TABLE_OFFSET.size)
 
-        f.write(struct.pack('<I', 0))
+        write_object = AppInfoParser._make_serializer(key_table)
+        pack_uint32 = AppInfoParser._UINT32.pack
+        chunk_size = AppInfoParser.WRITE_CHUNK_SIZE
+        headers = headers or {}
+        for app_id, app_data in apps.items():
+            buf += pack_uint32(int(app_id))
+            AppInfoParser._write_app_entry(buf, app_data, version, write_object, key_table, headers.get(app_id),
+                                           app_id in unchanged, record_cache, app_id)
+            if len(buf) >= chunk_size:
+                f.write(buf)
+                buf.clear()
+
+        buf += pack_uint32(0)
+        if key_table is not None:
+            table_offset = f.tell() + len(buf)
+            AppInfoParser._write_string_table(buf, list(key_table))
+        f.write(buf)
+
+        if key_table is not None:
+            f.seek(table_offset_pos)
+            f.write(AppInfoParser._STRING_TABLE_OFFSET.pack(table_offset))
+            f.seek(0, 2)
+
+    @staticmethod
+    def dump_spliced(index: 'AppInfoIndex', apps: Dict[str, Dict], file_path: Path,
+                     records: Optional[Dict[str, bytes]] = None) -> bool:
+        """
+        Save a copy of index's file in which only the given apps are rewritten
+
+        Records of all other apps are copied byte for byte from the mapping,
+        so a save after a few edits costs about as much as copying the file.
+        Rewritten apps keep their header fields; apps not in the index are
+        appended. file_path must not be the indexed file itself, write to a
+        temporary file and replace the original once the index is closed.
+        records are raw records (app id to
+        end of data, see AppInfoIndex.get_record) written as they are; for
+        v29 their key indexes must agree with index's string table.
+        """
+        try:
+            with open(file_path, 'wb') as f:
+                AppInfoParser._write_spliced(f, index, apps, records)
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            print(f"Error saving appinfo.vdf: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
 
     @staticmethod
-    def _write_app_entry(f: BinaryIO, app_data: Dict, version: int):
-        """Write app entry with correct checksums"""
-        # Serialize VDF data to get size
-        data_buffer = BytesIO()
-        AppInfoParser._write_section(data_buffer, app_data)
-        serialized_data = data_buffer.getvalue()
-        size = len(serialized_data)
+    def _write_spliced(f: BinaryIO, index: 'AppInfoIndex', apps: Dict[str, Dict],
+                       records: Optional[Dict[str, bytes]] = None):
+        """Write index's records, re-serializing only the apps in apps"""
+        records = records or {}
+        mm = index._mm
+        if mm is None:
+            raise ValueError("AppInfoIndex is not open")
+        # Slices of the memoryview are written without an intermediate copy
+        view = index._view
+        version = index.version
+        start = AppInfoParser._records_start(version)
+        f.write(view[:AppInfoParser._FILE_HEADER.size])
 
-        # Calculate checksum from TEXT VDF format (for sha_hash)
-        text_vdf = AppInfoParser._to_text_vdf(app_data)
-        sha_hash = hashlib.sha1(text_vdf.encode('utf-8')).digest()
+        # V29: Copied records refer to the original string table by index, so
+        # it is kept as is and keys of rewritten apps are appended to it
+        key_table = None
+        if version >= AppInfoParser.MAGIC_V29:
+            strings = index._string_table
+            key_table = {}
+            for i, key in enumerate(strings):
+                # A duplicate still takes up its index
+                key_table[key if key not in key_table else (None, i)] = i
+            table_offset_pos = f.tell()
+            f.write(bytes(AppInfoParser._STRING_TABLE_OFFSET.size))
 
-        # Calculate binary data checksum (for binary_data_hash in v28+)
-        binary_data_hash = hashlib.sha1(serialized_data).digest()
+        write_object = AppInfoParser._make_serializer(key_table)
+        has_binary_hash = version >= AppInfoParser.MAGIC_V28
+        buf = bytearray()
 
-        # Write header
-        f.write(struct.pack('<I', size))
-        f.write(struct.pack('<I', 2))  # info_state
-        f.write(struct.pack('<I', 0))  # last_updated
-        f.write(struct.pack('<Q', 0))  # access_token
-        f.write(sha_hash)
+        # Unmodified records are copied in runs up to the next rewritten app
+        run_start = run_end = start
+        for app_id, (offset, size) in index.offsets.items():
+            app_data = apps.get(app_id)
+            record = records.get(app_id)
+            if app_data is None and record is None:
+                if offset != run_end:
+                    f.write(view[run_start:run_end])
+                    run_start = offset
+                run_end = offset + 8 + size
+                continue
+            f.write(view[run_start:run_end])
+            run_start = run_end = offset + 8 + size
+            if record is not None:
+                f.write(record)
+                continue
+            buf += view[offset:offset + 4]
+            header = AppInfoParser._read_header(mm, offset, has_binary_hash)
+            AppInfoParser._write_app_entry(buf, app_data, version, write_object, key_table, header)
+            f.write(buf)
+            buf.clear()
+        f.write(view[run_start:run_end])
 
-        # V28/29: Write binary data hash BEFORE change_number
-        if version >= AppInfoParser.MAGIC_V28:
-            f.write(binary_data_hash)
+        for app_id, record in records.items():
+            if app_id not in index.offsets:
+                buf += record
+        for app_id, app_data in apps.items():
+            if app_id not in index.offsets and app_id not in records:
+                buf += AppInfoParser._UINT32.pack(int(app_id))
+                AppInfoParser._write_app_entry(buf, app_data, version, write_object, key_table)
 
-        f.write(struct.pack('<I', 0))  # change_number
+        buf += AppInfoParser._UINT32.pack(0)
+        if key_table is not None:
+            table_offset = f.tell() + len(buf)
+            AppInfoParser._write_string_table(buf, strings + list(key_table)[len(strings):])
+        f.write(buf)
 
-        # Write VDF data
-        f.write(serialized_data)
+        if key_table is not None:
+            f.seek(table_offset_pos)
+            f.write(AppInfoParser._STRING_TABLE_OFFSET.pack(table_offset))
+            f.seek(0, 2)
 
     @staticmethod
-    def _write_section(f: BinaryIO, data: Dict, section_name: str = ''):
-        """Write VDF section"""
-        f.write(bytes([AppInfoParser.TYPE_NONE]))
-        AppInfoParser._write_cstring(f, section_name)
+    def _write_app_entry(buf: bytearray, app_data: Dict, version: int, write_object,
+                         key_table: Optional[Dict[str, int]] = None,
+                         header: Optional[AppInfoHeader] = None, unchanged: bool = False,
+                         record_cache: Optional[Dict[str, CachedRecord]] = None, app_id: str = None):
+        """
+        Append app entry with correct checksums (everything after the app id)
 
-        for key, value in data.items():
-            AppInfoParser._write_entry(f, key, value)
-
-        f.write(bytes([AppInfoParser.TYPE_END]))
-
-    @staticmethod
-    def _write_entry(f: BinaryIO, key: str, value: Any):
-        """Write key-value entry"""
-        if isinstance(value, dict):
-            f.write(bytes([AppInfoParser.TYPE_NONE]))
-            AppInfoParser._write_cstring(f, key)
-            for inner_key, inner_value in value.items():
-                AppInfoParser._write_entry(f, inner_key, inner_value)
-            f.write(bytes([AppInfoParser.TYPE_END]))
-
-        elif isinstance(value, str):
-            f.write(bytes([AppInfoParser.TYPE_STRING]))
-            AppInfoParser._write_cstring(f, key)
-            AppInfoParser._write_cstring(f, value)
-
-        elif isinstance(value, int):
-            if -2147483648 <= value <= 2147483647:
-                f.write(bytes([AppInfoParser.TYPE_INT32]))
-                AppInfoParser._write_cstring(f, key)
-                f.write(struct.pack('<i', value))
+        The header is reserved first and filled in with pack_into once the
+        data behind it has been serialized and hashed in place.
+        """
+        cached = None
+        if record_cache is not None:
+            cached = record_cache.get(app_id)
+            if cached is not None and not AppInfoParser._cache_usable(cached, app_data, key_table):
+                cached = None
+
+        header_pos = len(buf)
+        buf += bytes(AppInfoParser._ENTRY_HEADER.size)
+        binary_hash_pos = len(buf)
+        if version >= AppInfoParser.MAGIC_V28:
+            buf += bytes(AppInfoParser.BINARY_HASH_SIZE)
+        data_pos = len(buf)
+
+        if cached is not None:
+            buf += cached.data
+            sha_hash = cached.text_sha1
+            binary_hash = cached.binary_sha1
+        else:
+            write_object(buf, app_data)
+            with memoryview(buf) as view:
+                binary_hash = hashlib.sha1(view[data_pos:]).digest()
+
+            if header is not None and unchanged:
+                # Same data the stored hash was computed from
+                sha_hash = header.sha1
             else:
-                f.write(bytes([AppInfoParser.TYPE_UINT64]))
-                AppInfoParser._write_cstring(f, key)
-                f.write(struct.pack('<Q', value))
+                sha_hash = AppInfoParser.text_sha1(app_data)
+
+            if record_cache is not None:
+                keys = None
+                if key_table is not None:
+                    keys = tuple((key, key_table[key]) for key in AppInfoParser._iter_keys(app_data))
+                record_cache[app_id] = CachedRecord(app_data, sha_hash, binary_hash, bytes(buf[data_pos:]), keys)
+
+        # Size counts everything after the size field
+        size = len(buf) - header_pos - 4
+        if header is not None:
+            AppInfoParser._ENTRY_HEADER.pack_into(buf, header_pos, size, header.info_state, header.last_updated,
+                                                  header.token, sha_hash, header.change_number)
         else:
-            # Fallback: convert to string
-            f.write(bytes([AppInfoParser.TYPE_STRING]))
-            AppInfoParser._write_cstring(f, key)
-            AppInfoParser._write_cstring(f, str(value))
+            AppInfoParser._ENTRY_HEADER.pack_into(buf, header_pos, size, 2, 0, 0, sha_hash, 0)
+
+        # V28/29: Binary data hash follows change_number
+        if version >= AppInfoParser.MAGIC_V28:
+            buf[binary_hash_pos:data_pos] = binary_hash
+
+    @staticmethod
+    def _cache_usable(cached: CachedRecord, app_data: Dict, key_table: Optional[Dict[str, int]]) -> bool:
+        """
+        Check whether a cached record can be written for app_data
+
+        v29 bytes hold string table indexes, so every key must map to the
+        index it had when the record was cached. Keys not in the table yet are
+        added in the order the serializer would add them.
+        """
+        if cached.source is not app_data or (cached.keys is None) != (key_table is None):
+            return False
+        if key_table is not None:
+            for key, index in cached.keys:
+                current = key_table.get(key)
+                if current is None and index == len(key_table):
+                    key_table[key] = index
+                elif current != index:
+                    return False
+        return True
+
+    @staticmethod
+    def _iter_keys(data: Dict) -> Iterator[str]:
+        """Distinct keys of a VDF object in the order the serializer meets them"""
+        seen = set()
+        stack = [iter(data.items())]
+        while stack:
+            for key, value in stack[-1]:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+                if isinstance(value, dict):
+                    stack.append(iter(value.items()))
+                    break
+            else:
+                stack.pop()
+
+    @staticmethod
+    def _make_serializer(key_table: Optional[Dict[str, int]] = None):
+        """
+        Build a write_object(buf, data) function that appends binary VDF to buf
+
+        The counterpart of _make_object_reader: one bytearray collects the
+        whole record, and the type byte plus encoded key of every entry is
+        built once per key and type and then appended as a single bytes
+        object. With a key_table (v29) keys become indexes into it, new keys
+        are added in the order they are first written.
+        """
+        TYPE_NONE = AppInfoParser.TYPE_NONE
+        TYPE_STRING = AppInfoParser.TYPE_STRING
+        TYPE_INT32 = AppInfoParser.TYPE_INT32
+        TYPE_UINT64 = AppInfoParser.TYPE_UINT64
+        TYPE_INT64 = AppInfoParser.TYPE_INT64
+        END = AppInfoParser.TYPE_END
+        pack_int32 = AppInfoParser._INT32.pack
+        pack_uint32 = AppInfoParser._UINT32.pack
+        pack_uint64 = AppInfoParser._UINT64.pack
+        pack_int64 = AppInfoParser._INT64.pack
+        encoded_keys: Dict[str, bytes] = {}
+        prefixes: Dict[Tuple[int, str], bytes] = {}
+
+        def prefix(type_id: int, key: str) -> bytes:
+            encoded = encoded_keys.get(key)
+            if encoded is None:
+                if key_table is None:
+                    encoded = key.encode('utf-8', errors='replace') + b'\x00'
+                else:
+                    index = key_table.get(key)
+                    if index is None:
+                        index = key_table[key] = len(key_table)
+                    encoded = pack_uint32(index)
+                encoded_keys[key] = encoded
+            result = prefixes[type_id, key] = bytes((type_id,)) + encoded
+            return result
+
+        def write_object(buf: bytearray, data: Dict):
+            get_prefix = prefixes.get
+            for key, value in data.items():
+                value_type = type(value)
+                if value_type is str:
+                    buf += get_prefix((TYPE_STRING, key)) or prefix(TYPE_STRING, key)
+                    buf += value.encode('utf-8', errors='replace')
+                    buf.append(0)
+                elif value_type is dict or isinstance(value, dict):
+                    buf += get_prefix((TYPE_NONE, key)) or prefix(TYPE_NONE, key)
+                    write_object(buf, value)
+                elif isinstance(value, int):
+                    if -2147483648 <= value <= 2147483647:
+                        buf += get_prefix((TYPE_INT32, key)) or prefix(TYPE_INT32, key)
+                        buf += pack_int32(value)
+                    elif value < 0:
+                        buf += get_prefix((TYPE_INT64, key)) or prefix(TYPE_INT64, key)
+                        buf += pack_int64(value)
+                    else:
+                        buf += get_prefix((TYPE_UINT64, key)) or prefix(TYPE_UINT64, key)
+                        buf += pack_uint64(value)
+                else:
+                    # Fallback: convert to string
+                    buf += get_prefix((TYPE_STRING, key)) or prefix(TYPE_STRING, key)
+                    buf += str(value).encode('utf-8', errors='replace')
+                    buf.append(0)
+            buf.append(END)
+
+        return write_object
 
     @staticmethod
-    def _write_cstring(f: BinaryIO, s: str):
-        """Write null-terminated string"""
-        f.write(s.encode('utf-8', errors='replace'))
-        f.write(b'\x00')
+    def _write_string_table(buf: bytearray, keys: List[str]):
+        """Append the v29 key string table (count + null-terminated keys)"""
+        buf += AppInfoParser._UINT32.pack(len(keys))
+        for key in keys:
+            buf += key.encode('utf-8', errors='replace')
+            buf.append(0)
+
+    @staticmethod
+    def text_sha1(app_data: Dict) -> bytes:
+        """The SHA1 Steam stores in a record header, computed from the TEXT VDF form of the data"""
+        return hashlib.sha1(AppInfoParser._to_text_vdf(app_data).encode('utf-8')).digest()
+
+    @staticmethod
+    def diff_common(old_app: Optional[Dict], new_app: Optional[Dict]) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Field-level changes under appinfo.common from old_app to new_app
+
+        Returns {key: (old, new)}; a missing app or key is None on its side,
+        nested values are compared as a whole.
+        """
+        old = ((old_app or {}).get('appinfo') or {}).get('common') or {}
+        new = ((new_app or {}).get('appinfo') or {}).get('common') or {}
+        changes = {}
+        for key, value in old.items():
+            if new.get(key) != value:
+                changes[key] = (value, new.get(key))
+        for key, value in new.items():
+            if key not in old:
+                changes[key] = (None, value)
+        return changes
 
     @staticmethod
     def _to_text_vdf(data: Dict, indent: int = 0) -> str:
@@ -355,6 +1226,185 @@ class AppInfoParser:
         return s
 
 
+class AppInfoIndex:
+    """
+    Offset index over appinfo.vdf with on-demand per-app decoding
+
+    Opening the index only walks the record headers (using their size field
+    to jump from record to record), so it costs a few milliseconds and a
+    small dict no matter how many apps Steam has cached. The VDF data of an
+    app is decoded from the memory-mapped file when get_app() asks for it.
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self.version = 0
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+        self.fingerprints: Dict[str, Tuple[int, bytes]] = {}
+        self._file = None
+        self._mm = None
+        self._view = None
+        self._read_object = None
+        self._read_projection = None
+        self._string_table = None
+        self._header_size = 0
+
+    def open(self) -> 'AppInfoIndex':
+        """Map the file and scan its record headers"""
+        self.close()
+        self._file = open(self.file_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.version = AppInfoParser._read_magic(self._mm)
+            self.offsets, self.fingerprints = AppInfoParser._scan_records(self._mm, self.version)
+            self._string_table = string_table = AppInfoParser._read_string_table(self._mm, self.version)
+        except Exception:
+            self.close()
+            raise
+        self._view = memoryview(self._mm)
+        self._read_object = AppInfoParser._make_object_reader(self._mm, self._view, string_table)
+        self._read_projection = AppInfoParser._make_projection_reader(self._mm, self._view, string_table)
+        self._header_size = AppInfoParser._record_header_size(self.version)
+        return self
+
+    def close(self):
+        """Release the mapping (must happen before the file is rewritten)"""
+        self._read_object = None
+        self._read_projection = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def changed_since(self, fingerprints: Dict[str, Tuple[int, bytes]]) -> Set[str]:
+        """App ids added, removed or changed (change number or SHA1) compared to fingerprints"""
+        current = self.fingerprints
+        changed = {app_id for app_id, fp in current.items() if fingerprints.get(app_id) != fp}
+        changed.update(app_id for app_id in fingerprints if app_id not in current)
+        return changed
+
+    def refresh(self) -> Set[str]:
+        """Re-scan the file and return the app ids whose records changed"""
+        previous = self.fingerprints
+        self.open()
+        return self.changed_since(previous)
+
+    def __enter__(self) -> 'AppInfoIndex':
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, app_id: str) -> bool:
+        return app_id in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def get_header(self, app_id: str) -> Optional[AppInfoHeader]:
+        """Decode the record header of a single app"""
+        entry = self.offsets.get(app_id)
+        if entry is None:
+            return None
+        if self._mm is None:
+            raise ValueError("AppInfoIndex is not open")
+        return AppInfoParser._read_header(self._mm, entry[0], self.version >= AppInfoParser.MAGIC_V28)
+
+    def verify(self, app_ids: Iterable[str] = None, workers: int = None) -> List[str]:
+        """App ids whose binary SHA1 does not match their data, see AppInfoParser.verify"""
+        if self._mm is None:
+            raise ValueError("AppInfoIndex is not open")
+        offsets = self.offsets
+        if app_ids is not None:
+            offsets = {app_id: offsets[app_id] for app_id in app_ids if app_id in offsets}
+        return AppInfoParser._verify_records(self._mm, self._view, self.version, offsets, workers)
+
+    def get_record(self, app_id: str) -> Optional[bytes]:
+        """Raw bytes of an app's record, from its app id to the end of its data"""
+        entry = self.offsets.get(app_id)
+        if entry is None:
+            return None
+        if self._mm is None:
+            raise ValueError("AppInfoIndex is not open")
+        offset, size = entry
+        return self._mm[offset:offset + 8 + size]
+
+    def record_strings(self, app_ids: Iterable[str]) -> Dict[int, str]:
+        """String table entries (index -> key) the records of app_ids refer to; empty before v29"""
+        if self._string_table is None:
+            return {}
+        keys = set()
+        for app_id in app_ids:
+            data = self.get_app(app_id)
+            if data is not None:
+                keys.update(AppInfoParser._iter_keys(data))
+        return {index: key for index, key in enumerate(self._string_table) if key in keys}
+
+    def accepts_records(self, magic: int, strings: Dict[int, str]) -> bool:
+        """Whether raw records with this magic and string entries can be spliced in as they are"""
+        if magic != self.version:
+            return False
+        table = self._string_table or []
+        return all(index < len(table) and table[index] == key for index, key in strings.items())
+
+    def get_app(self, app_id: str, paths=None) -> Optional[Dict[str, Any]]:
+        """
+        Decode the VDF data of a single app
+
+        paths limits decoding to the given key paths; it may be a list of
+        paths or a tree from AppInfoParser.compile_paths() for repeated calls.
+        """
+        entry = self.offsets.get(app_id)
+        if entry is None:
+            return None
+        if self._read_object is None:
+            raise ValueError("AppInfoIndex is not open")
+
+        offset, _ = entry
+        try:
+            if paths is None:
+                data, _ = self._read_object(offset + self._header_size)
+            else:
+                if not isinstance(paths, ProjectionNode):
+                    paths = AppInfoParser.compile_paths(paths)
+                data, _ = self._read_projection(offset + self._header_size, paths)
+        except (IndexError, struct.error) as e:
+            raise ValueError(f"Unexpected EOF in app {app_id}") from e
+        return data
+
+    def diff(self, other: 'AppInfoIndex') -> Dict[str, Dict[str, Tuple[Any, Any]]]:
+        """
+        Field-level changes under appinfo.common from this file to other
+
+        Records are compared by their stored SHA1 first, so only apps that
+        were added, removed or rewritten get their common block decoded.
+        Returns {app_id: {key: (old, new)}} for apps with common changes.
+        """
+        if self._read_projection is None or other._read_projection is None:
+            raise ValueError("AppInfoIndex is not open")
+        ours, theirs = self.fingerprints, other.fingerprints
+        candidates = {app_id for app_id, fp in ours.items()
+                      if app_id not in theirs or theirs[app_id][1] != fp[1]}
+        candidates.update(app_id for app_id in theirs if app_id not in ours)
+
+        projection = AppInfoParser.compile_paths([AppInfoParser.COMMON_PATH])
+        changes = {}
+        for app_id in sorted(candidates, key=int):
+            fields = AppInfoParser.diff_common(self.get_app(app_id, projection),
+                                               other.get_app(app_id, projection))
+            if fields:
+                changes[app_id] = fields
+        return changes
+
+
 def load_appinfo(file_path: Path) -> Dict:
     """Load appinfo.vdf file"""
     return AppInfoParser.load(file_path)
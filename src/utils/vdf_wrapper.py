@@ -4,7 +4,7 @@ Speichern als: src/utils/vdf_wrapper.py
 """
 
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Iterable, Iterator, Tuple
 from src.utils.appinfo_vdf_parser import AppInfoParser
 
 class AppInfoVDF:
@@ -15,5 +15,14 @@ class AppInfoVDF:
         return AppInfoParser.load(file_path)
     
     @staticmethod
-    def dump(data: Dict, file_path: Path) -> bool:
-        return AppInfoParser.dump(data, file_path)
+    def iter_apps(file_path: Path, app_ids: Iterable[str] = None) -> Iterator[Tuple[str, Any, Dict]]:
+        return AppInfoParser.iter_apps(file_path, app_ids)
+
+    @staticmethod
+    def dump(data: Dict, file_path: Path, version: int = None,
+             headers: Dict = None, unchanged: Iterable[str] = None, record_cache: Dict = None) -> bool:
+        return AppInfoParser.dump(data, file_path, version, headers, unchanged, record_cache)
+
+    @staticmethod
+    def dump_spliced(index, apps: Dict, file_path: Path, records: Dict = None) -> bool:
+        return AppInfoParser.dump_spliced(index, apps, file_path, records)
@@ -0,0 +1,133 @@
+"""
+Tests for saving, restoring and journaling in AppInfoManager
+Speichern als: tests/test_appinfo_manager.py
+"""
+import json
+
+import pytest
+
+from scripts.generate_appinfo import VERSIONS, generate_apps
+from src.core.appinfo_manager import AppInfoManager
+from src.utils.appinfo_vdf_parser import AppInfoParser
+
+
+@pytest.fixture
+def steam(tmp_path):
+    """Steam directory with a synthetic v29 appinfo.vdf"""
+    steam_path = tmp_path / 'steam'
+    (steam_path / 'appcache').mkdir(parents=True)
+    assert AppInfoParser.dump(generate_apps(20), steam_path / 'appcache' / 'appinfo.vdf',
+                              AppInfoParser.MAGIC_V29)
+    return steam_path
+
+
+@pytest.fixture
+def open_manager(tmp_path):
+    """Factory for managers whose index and history are closed after the test"""
+    managers = []
+
+    def make(steam_path):
+        manager = AppInfoManager(steam_path, tmp_path / f'cache{len(managers)}')
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+@pytest.mark.parametrize('version', sorted(VERSIONS))
+def test_restore_delta_backup(tmp_path, open_manager, version):
+    steam_path = tmp_path / 'steam'
+    (steam_path / 'appcache').mkdir(parents=True)
+    appinfo_path = steam_path / 'appcache' / 'appinfo.vdf'
+    assert AppInfoParser.dump(generate_apps(20), appinfo_path, VERSIONS[version])
+    original = appinfo_path.read_bytes()
+
+    manager = open_manager(steam_path)
+    assert manager.load_index()
+    assert manager.set_app_metadata('20', {'name': 'First'})
+    assert manager.save_appinfo()
+    assert manager.set_app_metadata('20', {'developer': 'Second'})
+    assert manager.set_app_metadata('30', {'name': 'Second'})
+    assert manager.save_appinfo()
+    assert AppInfoParser.verify(appinfo_path) == []
+
+    first, second = manager.get_delta_backups()
+    # Undoing the first save undoes the second as well
+    assert manager.restore_delta_backup(first) == 2
+    assert appinfo_path.read_bytes() == original
+    assert manager.get_app_metadata('20')['name'] != 'First'
+
+    # The restore left its own delta, which brings both saves back
+    undo = manager.get_delta_backups()[-1]
+    assert undo not in (first, second)
+    assert manager.restore_delta_backup(undo, create_backup=False) == 2
+    assert manager.get_app_metadata('20')['developer'] == 'Second'
+    assert manager.get_app_metadata('30')['name'] == 'Second'
+    assert AppInfoParser.verify(appinfo_path) == []
+
+
+def test_journal_replay(steam, open_manager):
+    manager = open_manager(steam)
+    assert manager.load_index()
+    assert manager.set_app_metadata('10', {'name': 'A'})
+    assert manager.set_app_metadata('20', {'name': 'B'})
+    assert manager.revert_app('20')
+    assert manager.set_app_metadata('30', {'developer': 'C'})
+
+    entries = [json.loads(line) for line in manager.journal_file.read_text(encoding='utf-8').splitlines()]
+    assert entries[-2] == {'app_id': '20', 'modification': None}
+    assert entries[-1]['app_id'] == '30'
+    assert not manager.changes_file.exists()
+
+    reloaded = open_manager(steam)
+    assert reloaded.modifications == manager.modifications
+    assert sorted(reloaded.modifications) == ['10', '30']
+
+
+def test_journal_torn_line(steam, open_manager):
+    manager = open_manager(steam)
+    assert manager.load_index()
+    assert manager.set_app_metadata('10', {'name': 'A'})
+    intact = manager.journal_file.read_bytes()
+    # A write interrupted halfway through a line
+    with open(manager.journal_file, 'ab') as f:
+        f.write(b'{"app_id": "20", "modi')
+
+    reloaded = open_manager(steam)
+    assert sorted(reloaded.modifications) == ['10']
+    assert manager.journal_file.read_bytes() == intact
+
+    # Lines written after the truncation are not hidden behind the torn one
+    assert reloaded.load_index()
+    assert reloaded.set_app_metadata('30', {'name': 'C'})
+    assert sorted(open_manager(steam).modifications) == ['10', '30']
+
+
+def test_interrupted_compaction(steam, open_manager):
+    manager = open_manager(steam)
+    assert manager.load_index()
+    assert manager.set_app_metadata('10', {'name': 'A'})
+    # Crash after the journal was handed to the compaction
+    manager.journal_file.replace(manager.compacting_file)
+    assert manager.set_app_metadata('20', {'name': 'B'})
+
+    reloaded = open_manager(steam)
+    assert sorted(reloaded.modifications) == ['10', '20']
+    assert not manager.compacting_file.exists()
+    assert sorted(json.loads(manager.changes_file.read_text(encoding='utf-8'))) == ['10', '20']
+
+
+def test_close(steam, open_manager):
+    manager = open_manager(steam)
+    assert manager.load_index()
+    assert manager.set_app_metadata('10', {'name': 'A'})
+    assert manager.save_appinfo()
+    manager.close()
+    assert manager.index is None
+    assert manager.history._conn is None
+
+    # A closed manager can index the file again
+    assert manager.load_index()
+    assert manager.get_app_metadata('10')['name'] == 'A'
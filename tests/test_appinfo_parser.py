@@ -0,0 +1,80 @@
+"""
+Tests for the appinfo.vdf reader and writers
+Speichern als: tests/test_appinfo_parser.py
+"""
+import pytest
+
+from scripts.generate_appinfo import VERSIONS, generate_apps
+from src.utils.appinfo_vdf_parser import AppInfoHeader, AppInfoIndex, AppInfoParser
+
+
+@pytest.fixture(params=sorted(VERSIONS))
+def appinfo(request, tmp_path):
+    """A synthetic appinfo.vdf in each format version, and the apps in it"""
+    apps = generate_apps(20)
+    # Header fields as Steam fills them, so writers have to carry them over
+    headers = {app_id: AppInfoHeader(0, 2, 1700000000 + int(app_id), int(app_id) << 32, b'', int(app_id) * 7)
+               for app_id in apps}
+    path = tmp_path / 'appinfo.vdf'
+    assert AppInfoParser.dump(apps, path, VERSIONS[request.param], headers)
+    return path, apps
+
+
+def test_round_trip(appinfo, tmp_path):
+    path, apps = appinfo
+    assert AppInfoParser.load(path) == apps
+    assert AppInfoParser.verify(path) == []
+    assert AppInfoParser.load_headers(path)['20'].change_number == 140
+
+    copy = tmp_path / 'copy.vdf'
+    assert AppInfoParser.dump(AppInfoParser.load(path), copy, AppInfoParser.read_version(path),
+                              AppInfoParser.load_headers(path))
+    assert copy.read_bytes() == path.read_bytes()
+
+
+def test_dump_spliced_copies_clean_records(appinfo, tmp_path):
+    path, apps = appinfo
+    edited = AppInfoParser.load(path)['20']
+    edited['appinfo']['common']['name'] = 'Renamed'
+
+    out = tmp_path / 'spliced.vdf'
+    with AppInfoIndex(path) as index:
+        assert AppInfoParser.dump_spliced(index, {'20': edited}, out)
+        clean = {app_id: index.get_record(app_id) for app_id in index if app_id != '20'}
+        headers = {app_id: index.get_header(app_id) for app_id in index}
+
+    assert AppInfoParser.verify(out) == []
+    apps['20'] = edited
+    assert AppInfoParser.load(out) == apps
+    with AppInfoIndex(out) as index:
+        assert {app_id: index.get_record(app_id) for app_id in clean} == clean
+        header = index.get_header('20')
+        assert (header.info_state, header.last_updated, header.token, header.change_number) == \
+               (2, 1700000020, 20 << 32, 140)
+        assert header.sha1 == AppInfoParser.text_sha1(edited)
+        assert header.sha1 != headers['20'].sha1
+
+
+def test_dump_spliced_appends_new_keys(tmp_path):
+    """v29: keys unknown to the string table are appended to it, old indexes stay valid"""
+    apps = generate_apps(20)
+    path = tmp_path / 'appinfo.vdf'
+    assert AppInfoParser.dump(apps, path, AppInfoParser.MAGIC_V29)
+    edited = AppInfoParser.load(path)['30']
+    edited['appinfo']['common']['spliced_key'] = 'value'
+    added = generate_apps(1, seed=1)['10']
+    added['appinfo']['appid'] = 999
+    added['appinfo']['another_new_key'] = {'nested': 1}
+
+    out = tmp_path / 'spliced.vdf'
+    with AppInfoIndex(path) as index:
+        strings = list(index._string_table)
+        assert AppInfoParser.dump_spliced(index, {'30': edited, '999': added}, out)
+
+    assert AppInfoParser.verify(out) == []
+    apps['30'] = edited
+    apps['999'] = added
+    assert AppInfoParser.load(out) == apps
+    with AppInfoIndex(out) as index:
+        assert index._string_table[:len(strings)] == strings
+        assert {'spliced_key', 'another_new_key', 'nested'} <= set(index._string_table[len(strings):])